@@ -0,0 +1,56 @@
+"""Pytest setup of the benchmarks, results are emitted as JSON."""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "tools"))
+
+import measure  # noqa: E402  pylint: disable=wrong-import-position
+
+BENCH_RESULTS = pytest.StashKey[dict[str, Any]]()
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """Add option of the JSON results file."""
+    parser.addoption(
+        "--bench-output",
+        default=None,
+        help="write benchmark results as JSON to this file",
+    )
+
+
+@pytest.fixture(scope="session")
+def integration() -> tuple[Any, Any | None]:
+    """Return hubc2000pp module and integration package (None without HA)."""
+    return measure.load_integration()
+
+
+@pytest.fixture(scope="session")
+def bench_results(pytestconfig: pytest.Config) -> Iterator[dict[str, Any]]:
+    """Collect results of the benchmarks, one key per benchmark."""
+    results = measure.environment()
+    pytestconfig.stash[BENCH_RESULTS] = results
+    yield results
+
+
+def pytest_terminal_summary(terminalreporter: Any, config: pytest.Config) -> None:
+    """Write results to --bench-output or print them."""
+    results = config.stash.get(BENCH_RESULTS, None)
+    if results is None:
+        return
+
+    data = json.dumps(results, indent=2, ensure_ascii=False)
+    output = config.getoption("--bench-output")
+    if output:
+        Path(output).write_text(data + "\n")
+        terminalreporter.write_line(f"benchmark results written to {output}")
+    else:
+        terminalreporter.write_sep("-", "benchmark results")
+        terminalreporter.write_line(data)
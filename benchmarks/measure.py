@@ -0,0 +1,349 @@
+"""Measurements of the parse, update and dispatch hot paths.
+
+Used by the pytest benchmarks and tools/benchmark.py, the hub is simulated
+by tools/hubsim.py. Protocol measurements need only aioudp, the push to
+entity one needs homeassistant.
+"""
+
+from __future__ import annotations
+
+import gc
+import importlib
+import json
+from pathlib import Path
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import types
+from typing import Any
+
+import hubsim
+
+ROOT = Path(__file__).resolve().parent.parent
+INTEGRATION = ROOT / "custom_components" / "hubc2000pp"
+ZONE_COUNTS = (100, 1000, 10000)
+PUSHES = 20000
+REPEATS = 5
+SIM_PORT = 24200
+
+
+def load_integration() -> tuple[Any, Any | None]:
+    """Return hubc2000pp module and integration package (None without HA)."""
+    sys.path.insert(0, str(ROOT))
+    try:
+        package = importlib.import_module("custom_components.hubc2000pp")
+    except ImportError:
+        # bare package without __init__, its modules need only aioudp
+        bare = types.ModuleType("hubc2000pp")
+        bare.__path__ = [str(INTEGRATION)]
+        sys.modules[bare.__name__] = bare
+        return importlib.import_module("hubc2000pp.hubc2000pp"), None
+    return importlib.import_module("custom_components.hubc2000pp.hubc2000pp"), package
+
+
+def environment() -> dict[str, Any]:
+    """Return integration version and platform of the measurements."""
+    manifest = json.loads((INTEGRATION / "manifest.json").read_text())
+    return {
+        "version": manifest["version"],
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def best_of(func, repeats: int = REPEATS) -> float:
+    """Return the best run time of func in seconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def parse_store(hub_module, sim: hubsim.SimHub):
+    """Parse full lists of simulated hub into a device store."""
+    devices = hub_module.DeviceStore()
+    for reply, kind in zip(
+        (sim.handle("getZones"), sim.handle("getParts"), sim.handle("getRelays")),
+        hub_module.DEVICE_KINDS,
+    ):
+        devices.add_records(hub_module.parse_records(reply, (kind,)))
+    return devices
+
+
+def legacy_parse_zones(hub_module, reply: str) -> list[Any]:
+    """Parse getZones reply the way releases before the parser module did."""
+    zones = []
+    for line in reply.split(hub_module.SEP_STRING):
+        info = line.split(":")
+        if len(info) == 10 and info[0] == "zone":
+            zone_id = int(info[1])
+            zones.append(
+                hub_module.Zone(
+                    id=zone_id,
+                    sh=info[2],
+                    part=info[3],
+                    stype=info[4],
+                    state=hub_module.parse_code(info[5]),
+                    adc=hub_module.parse_adc(info[6]),
+                    type=info[7],
+                    dev=info[8],
+                    desc=info[9],
+                    uid=f"{zone_id}.{info[2]}.{info[3]}.{info[4]}",
+                )
+            )
+    return zones
+
+
+def bench_parse(hub_module) -> list[dict[str, Any]]:
+    """Time getZones/getParts/getRelays parsing and memory per zone.
+
+    getZones parsing is also compared with the split per field parser of
+    previous releases.
+    """
+    results = []
+    for zones in ZONE_COUNTS:
+        sim = hubsim.SimHub(zones)
+        parse_time = best_of(lambda: parse_store(hub_module, sim))
+        reply = sim.handle("getZones")
+        zones_time = best_of(lambda: hub_module.parse_records(reply, ("zone",)))
+        legacy_time = best_of(lambda: legacy_parse_zones(hub_module, reply))
+
+        gc.collect()
+        tracemalloc.start()
+        devices = parse_store(hub_module, sim)
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        assert len(devices.zones) == zones and not devices.record_errors
+
+        results.append(
+            {
+                "zones": zones,
+                "parse_ms": parse_time * 1000,
+                "parse_us_per_zone": parse_time * 1e6 / zones,
+                "zones_parse_ms": zones_time * 1000,
+                "legacy_zones_parse_ms": legacy_time * 1000,
+                "reply_bytes": len(reply.encode()),
+                "memory_bytes_per_zone": memory / zones,
+            }
+        )
+    return results
+
+
+def bench_wire(hub_module) -> list[dict[str, Any]]:
+    """Compare text and binary zone pages: bytes and parse time per full sync.
+
+    Binary pages are measured with metadata cached by a first sync, as they
+    are on every full sync but the first one. Zone pages are taken before
+    and binary and getChanges pages after an ADC change of every zone, the
+    largest replies the script can send.
+    """
+    results = []
+    for zones in ZONE_COUNTS:
+        sim = hubsim.SimHub(zones)
+        text_pages = [
+            sim.get_zones(offset, hub_module.ZONES_PAGE_SIZE)
+            for offset in range(0, zones, hub_module.ZONES_PAGE_SIZE)
+        ]
+        meta_offsets = range(0, zones, hub_module.ZONES_PAGE_SIZE)
+        meta_pages = [
+            sim.get_zones_meta(offset, hub_module.ZONES_PAGE_SIZE)
+            for offset in meta_offsets
+        ]
+        meta = hub_module.ZoneMetaCache()
+        for offset, page in zip(meta_offsets, meta_pages):
+            for zone_meta in hub_module.parse_zones_meta_page(page, offset):
+                meta.zones[zone_meta.id] = zone_meta
+        for zone_id in sim.zone_ids:
+            sim.set_adc(zone_id, round(sim.random.uniform(-100, 100), 2))
+        changes_page = sim.get_changes(str(sim.epoch), "0")
+        bin_offsets = range(0, zones, hub_module.ZONES_BIN_PAGE_SIZE)
+        bin_pages = [
+            sim.get_zones_bin(offset, hub_module.ZONES_BIN_PAGE_SIZE)
+            for offset in bin_offsets
+        ]
+
+        def parse_text() -> None:
+            for page in text_pages:
+                hub_module.parse_records(page.partition(hub_module.SEP_STRING)[2])
+
+        def parse_binary() -> None:
+            for offset, page in zip(bin_offsets, bin_pages):
+                _, _, states = hub_module.parse_zones_bin_page(page, offset)
+                hub_module.zones_of_states(states, meta)
+
+        text_time = best_of(parse_text)
+        bin_time = best_of(parse_binary)
+        bin_bytes = sum(len(page.encode()) for page in bin_pages)
+        results.append(
+            {
+                "zones": zones,
+                "text_bytes": sum(len(page.encode()) for page in text_pages),
+                "binary_first_sync_bytes": bin_bytes
+                + sum(len(page.encode()) for page in meta_pages),
+                "binary_bytes": bin_bytes,
+                "text_max_page_bytes": max(len(page.encode()) for page in text_pages),
+                "meta_max_page_bytes": max(len(page.encode()) for page in meta_pages),
+                "changes_max_page_bytes": len(changes_page.encode()),
+                "binary_max_page_bytes": max(len(page.encode()) for page in bin_pages),
+                "text_parse_ms": text_time * 1000,
+                "binary_parse_ms": bin_time * 1000,
+            }
+        )
+    return results
+
+
+async def bench_get_devices(hub_module) -> list[dict[str, Any]]:
+    """Time get_devices over loopback UDP against the simulator.
+
+    Zones are fetched by text pages, then by binary pages with metadata
+    cached by the first binary sync.
+    """
+    results = []
+    for index, zones in enumerate(ZONE_COUNTS):
+        # own port per run, closed transports release their port a tick later
+        port = SIM_PORT + 2 * index
+        sim = hubsim.SimHub(zones)
+        transport, _ = await hubsim.start_simulator(sim, port=port)
+        client = hub_module.HUBC2000PPCommandClient("127.0.0.1", port)
+        meta = hub_module.ZoneMetaCache()
+        try:
+            result: dict[str, Any] = {"zones": zones}
+            for name, cache in (("text", None), ("binary", meta)):
+                if cache is not None:
+                    await hub_module.get_devices(client, cache)
+                sim.commands = 0
+                times = []
+                for _ in range(REPEATS):
+                    start = time.perf_counter()
+                    devices = await hub_module.get_devices(client, cache)
+                    times.append(time.perf_counter() - start)
+                    assert (
+                        len(devices.zones) == zones
+                        and not devices.error
+                        and not devices.record_errors
+                    )
+                result[f"{name}_get_devices_ms"] = min(times) * 1000
+                result[f"{name}_commands"] = sim.commands // REPEATS
+        finally:
+            await client.close()
+            transport.close()
+        results.append(result)
+    return results
+
+
+def push_messages(sim: hubsim.SimHub, count: int, kind: str = "zone") -> list[str]:
+    """Make numbered pushes of random zone, partition or relay changes."""
+    messages = []
+    while len(messages) < count:
+        if kind == "part":
+            part_id = sim.random.choice(list(sim.parts))
+            armed = sim.parts[part_id] == hubsim.PART_ARMED
+            sim.set_part(part_id, hubsim.PART_DISARMED if armed else hubsim.PART_ARMED)
+        elif kind == "relay":
+            relay_id = sim.random.choice(list(sim.relays))
+            sim.set_relay(relay_id, not sim.relays[relay_id])
+        else:
+            sim.set_zone(
+                sim.random.choice(sim.zone_ids), sim.random.choice(hubsim.ZONE_CODES)
+            )
+        messages.extend(sim.outbox)
+        sim.outbox.clear()
+    return messages
+
+
+def latency_stats(latencies: list[float]) -> dict[str, float | None]:
+    """Return median and 99th percentile in microseconds, None if empty."""
+    if not latencies:
+        return {"latency_us_median": None, "latency_us_p99": None}
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return {
+        "latency_us_median": statistics.median(latencies) * 1e6,
+        "latency_us_p99": p99 * 1e6,
+    }
+
+
+def bench_update_device(hub_module) -> dict[str, Any]:
+    """Time update_device per push on a store of 1000 zones."""
+    sim = hubsim.SimHub(1000)
+    devices = parse_store(hub_module, sim)
+    messages = push_messages(sim, PUSHES)
+
+    def apply_all() -> None:
+        for message in messages:
+            hub_module.update_device(message, devices)
+
+    total = best_of(apply_all)
+    return {"pushes": PUSHES, "update_device_us_per_push": total * 1e6 / PUSHES}
+
+
+async def bench_push_to_entity(hub_module, package) -> dict[str, Any]:
+    """Time udp_callback to entity state write through platform handlers.
+
+    Zone pushes go to sensor and binary_sensor entities, partition pushes to
+    alarm_control_panel and relay pushes to switch entities.
+    """
+    # pylint: disable=import-outside-toplevel
+    from homeassistant.core import HomeAssistant
+
+    alarm_control_panel = importlib.import_module(
+        "custom_components.hubc2000pp.alarm_control_panel"
+    )
+    binary_sensor = importlib.import_module(
+        "custom_components.hubc2000pp.binary_sensor"
+    )
+    sensor = importlib.import_module("custom_components.hubc2000pp.sensor")
+    switch = importlib.import_module("custom_components.hubc2000pp.switch")
+
+    hass = HomeAssistant(str(ROOT))
+    sim = hubsim.SimHub(1000)
+    devices = parse_store(hub_module, sim)
+    coordinator = package.HUBC2000PPDataUpdateCoordinator(
+        hass, "127.0.0.1", SIM_PORT, coalesce_window=0
+    )
+    coordinator._devices = devices  # pylint: disable=protected-access
+    coordinator.data = devices
+
+    entities: list[tuple[str, Any, Any]] = []
+    for zone in devices.zones:
+        entities.append(("zones", zone.uid, sensor.Device(zone, coordinator, False)))
+        if zone.type in binary_sensor.BINARY_SENSORS:
+            entities.append(
+                ("zones", zone.uid, binary_sensor.BinaryDevice(zone, coordinator))
+            )
+    for part in devices.parts:
+        entities.append(
+            (
+                "parts",
+                part.id,
+                alarm_control_panel.AlarmControlPanelDevice(part, coordinator),
+            )
+        )
+    for relay in devices.relays:
+        entities.append(("relays", relay.id, switch.SwitchDevice(relay, coordinator)))
+
+    written: list[float] = []
+    for kind, key, entity in entities:
+        entity.hass = hass
+        entity.async_write_ha_state = lambda: written.append(time.perf_counter())
+        coordinator.async_subscribe_device(kind, key, entity._handle_coordinator_update)
+
+    results: dict[str, Any] = {}
+    for kind in ("zone", "part", "relay"):
+        latencies = []
+        for message in push_messages(sim, PUSHES, kind):
+            written.clear()
+            start = time.perf_counter()
+            coordinator.udp_callback(message)
+            if written:
+                latencies.append(written[-1] - start)
+        results[kind] = {"pushes": PUSHES, "writes": len(latencies)}
+        results[kind].update(latency_stats(latencies))
+
+    await hass.async_stop(force=True)
+    return results
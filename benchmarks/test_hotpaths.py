@@ -0,0 +1,76 @@
+"""Benchmarks of the parse, update and dispatch hot paths.
+
+    python -m pytest benchmarks --bench-output bench.json
+
+Every test stores its measurements in bench_results, they are emitted as
+JSON at the end of the session to compare releases.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+import measure
+
+# largest UDP payload sent without IP fragmentation on Ethernet
+UNFRAGMENTED_DATAGRAM = 1472
+
+
+def test_parse(integration: tuple[Any, Any], bench_results: dict[str, Any]) -> None:
+    """Parse time and memory per zone of full lists."""
+    hub_module, _ = integration
+    results = measure.bench_parse(hub_module)
+    bench_results["parse"] = results
+    assert [result["zones"] for result in results] == list(measure.ZONE_COUNTS)
+
+
+def test_wire(integration: tuple[Any, Any], bench_results: dict[str, Any]) -> None:
+    """Size and parse time of text and binary zone pages.
+
+    Every page must fit in one datagram without IP fragmentation.
+    """
+    hub_module, _ = integration
+    results = measure.bench_wire(hub_module)
+    bench_results["wire"] = results
+    for result in results:
+        assert result["binary_bytes"] < result["text_bytes"]
+        for page in ("text", "meta", "changes", "binary"):
+            assert result[f"{page}_max_page_bytes"] <= UNFRAGMENTED_DATAGRAM
+
+
+def test_update_device(
+    integration: tuple[Any, Any], bench_results: dict[str, Any]
+) -> None:
+    """Time of update_device per push."""
+    hub_module, _ = integration
+    result = measure.bench_update_device(hub_module)
+    bench_results["update_device"] = result
+    assert result["update_device_us_per_push"] > 0
+
+
+def test_get_devices(
+    integration: tuple[Any, Any], bench_results: dict[str, Any]
+) -> None:
+    """Time of get_devices over loopback UDP by text and binary pages."""
+    hub_module, _ = integration
+    results = asyncio.run(measure.bench_get_devices(hub_module))
+    bench_results["get_devices"] = results
+    for result in results:
+        assert result["binary_commands"] <= result["text_commands"]
+
+
+def test_push_to_entity(
+    integration: tuple[Any, Any], bench_results: dict[str, Any]
+) -> None:
+    """Latency from udp_callback to entity state write per platform."""
+    hub_module, package = integration
+    if package is None:
+        bench_results["push_to_entity"] = {"skipped": "homeassistant is not installed"}
+        pytest.skip("homeassistant is not installed")
+    result = asyncio.run(measure.bench_push_to_entity(hub_module, package))
+    bench_results["push_to_entity"] = result
+    for kind in ("zone", "part", "relay"):
+        assert result[kind]["writes"] > 0
@@ -2,17 +2,44 @@
 from __future__ import annotations
 
 import asyncio
+from collections.abc import Callable
 from datetime import timedelta
 import logging
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 
-from .const import DOMAIN, KEY_SETUP_LOCK, KEY_UNSUB_STOP, LISTENER_KEY
-from .hubc2000pp import HUBC2000PPUdpReceiver, get_devices, update_device
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CRITICAL_EVENTS,
+    DEFAULT_COALESCE_WINDOW,
+    DOMAIN,
+    KEY_SETUP_LOCK,
+    KEY_UNSUB_STOP,
+    LISTENER_KEY,
+    POLL_INTERVAL_FAST,
+    POLL_INTERVAL_MAX,
+    STORAGE_KEY,
+    STORAGE_SAVE_DELAY,
+    STORAGE_VERSION,
+)
+from .hubc2000pp import (
+    COMMAND_ERRORS,
+    DeviceStore,
+    HUBC2000PPCommandBatcher,
+    HUBC2000PPCommandClient,
+    HUBC2000PPUdpReceiver,
+    PushSequence,
+    ZoneMetaCache,
+    apply_push,
+    get_changes,
+    get_devices,
+    parse_push,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,17 +56,36 @@ async def update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> Non
     await hass.config_entries.async_reload(config_entry.entry_id)
 
 
-class HUBC2000PPDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+class HUBC2000PPDataUpdateCoordinator(DataUpdateCoordinator[DeviceStore]):
     """Data update coordinator for HUB-C2000PP service."""
 
-    def __init__(self, hass: HomeAssistant, host: str, port: int) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        host: str,
+        port: int,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+        meta_store: Store[dict[str, Any]] | None = None,
+    ) -> None:
         """Initialize coordinator data."""
         self._hass = hass
         self._host = host
         self._port = port
-        self._devices: dict[str, Any] | None = None
+        self._client = HUBC2000PPCommandClient(host, port)
+        self._batcher = HUBC2000PPCommandBatcher(self._client)
+        self._devices: DeviceStore | None = None
+        self._zone_meta = ZoneMetaCache()
+        self._meta_store = meta_store
+        self._push_sequence = PushSequence()
+        self._device_listeners: dict[tuple[str, Any], list[Callable[[], None]]] = {}
+        self._poll_reason = "listener started"
+        self._coalesce_window = coalesce_window
+        # device -> loop time its coalescing window ends
+        self._coalesce_until: dict[tuple[str, Any], float] = {}
+        self._coalesce_pending: set[tuple[str, Any]] = set()
+        self._coalesce_timer: asyncio.TimerHandle | None = None
 
-        update_interval = timedelta(minutes=1)
+        update_interval = timedelta(seconds=POLL_INTERVAL_FAST)
         super().__init__(hass, _LOGGER, name=DOMAIN, update_interval=update_interval)
 
     @property
@@ -52,20 +98,210 @@ class HUBC2000PPDataUpdateCoordinator(DataUpdateCoordinator[dict[str, Any]]):
         """Port getter."""
         return self._port
 
+    @property
+    def client(self) -> HUBC2000PPCommandClient:
+        """Command client getter."""
+        return self._client
+
+    @property
+    def batcher(self) -> HUBC2000PPCommandBatcher:
+        """Command batcher getter."""
+        return self._batcher
+
+    @property
+    def poll_reason(self) -> str:
+        """Reason for the current poll interval."""
+        return self._poll_reason
+
+    async def async_load_zone_meta(self) -> None:
+        """Restore zone metadata saved by a previous run."""
+        if self._meta_store is not None:
+            data = await self._meta_store.async_load()
+            self._zone_meta = ZoneMetaCache.from_dict(data)
+
+    def _set_poll_interval(self, interval: timedelta, reason: str) -> None:
+        """Change poll interval, applied when the next poll is scheduled."""
+        if interval != self.update_interval:
+            _LOGGER.debug(
+                "HUB-C2000PP %s poll interval %s: %s", self._host, interval, reason
+            )
+        self.update_interval = interval
+        self._poll_reason = reason
+
     async def _async_update_data(self):
-        """Request data from hub."""
-        result = await get_devices(self._host, self._port)
-        if not result["error"]:
-            self._devices = result
+        """Request data from hub and adapt poll interval to push health."""
+        try:
+            missed = await self._async_fetch()
+        except UpdateFailed:
+            self._set_poll_interval(
+                timedelta(seconds=POLL_INTERVAL_FAST), "update failed"
+            )
+            raise
+
+        if missed:
+            self._set_poll_interval(
+                timedelta(seconds=POLL_INTERVAL_FAST),
+                f"{missed} changes missed by pushes",
+            )
         else:
-            _LOGGER.warning("HUB-C2000PP update error: %s", result["error"])
-            raise UpdateFailed()
+            self._set_poll_interval(
+                min(self.update_interval * 2, timedelta(seconds=POLL_INTERVAL_MAX)),
+                "pushes consistent with poll",
+            )
         return self._devices
 
+    async def _async_fetch(self) -> int:
+        """Request only changes if possible, return count of missed changes."""
+        if self._devices is not None:
+            try:
+                missed = await get_changes(self._client, self._devices, self._zone_meta)
+            except COMMAND_ERRORS as err:
+                _LOGGER.warning("HUB-C2000PP update error: %s", err)
+                raise UpdateFailed() from err
+            if missed is not None:
+                return missed
+
+        result = await get_devices(self._client, self._zone_meta)
+        if self._zone_meta.changed and self._meta_store is not None:
+            self._zone_meta.changed = False
+            self._meta_store.async_delay_save(
+                self._zone_meta.as_dict, STORAGE_SAVE_DELAY
+            )
+        if result.error:
+            _LOGGER.warning("HUB-C2000PP update error: %s", result.error)
+            raise UpdateFailed()
+        if result.record_errors:
+            _LOGGER.warning(
+                "HUB-C2000PP skipped %d malformed records, first: %s",
+                len(result.record_errors),
+                result.record_errors[0].record,
+            )
+
+        missed = 0
+        if self._devices is not None:
+            missed = result.count_changed(self._devices)
+        self._devices = result
+        return missed
+
+    @callback
+    def async_subscribe_device(
+        self, category: str, key: Any, update_callback: Callable[[], None]
+    ) -> CALLBACK_TYPE:
+        """Listen for pushes of a single device.
+
+        Category is "zones", "parts" or "relays", key is the zone uid or the
+        partition/relay id. Full refreshes still notify all listeners.
+        """
+        listeners = self._device_listeners.setdefault((category, key), [])
+        listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove device listener."""
+            listeners.remove(update_callback)
+            if not listeners:
+                self._device_listeners.pop((category, key), None)
+
+        return remove_listener
+
+    @property
+    def push_sequence(self) -> PushSequence:
+        """Push sequence getter."""
+        return self._push_sequence
+
     def udp_callback(self, message):
-        """Handle push from hub."""
-        update_device(message, self._devices)
-        self.async_update_listeners()
+        """Handle push from hub, notify only listeners of the updated device."""
+        self.udp_batch_callback([message])
+
+    def udp_batch_callback(self, messages: list[str]) -> None:
+        """Handle pushes received at once, write each updated device once."""
+        updated_devices: dict[tuple[str, Any], bool] = {}
+        for message in messages:
+            push = parse_push(message)
+            if push is None:
+                continue
+
+            if push.seq is not None and self._push_sequence.check(push.seq):
+                # pushes were lost, fetch changes now instead of waiting for poll
+                _LOGGER.debug("HUB-C2000PP push gap before %d, resync", push.seq)
+                self._set_poll_interval(
+                    timedelta(seconds=POLL_INTERVAL_FAST), "push gap"
+                )
+                self.hass.async_create_task(self.async_request_refresh())
+
+            updated = apply_push(push, self._devices)
+            if updated is None:
+                continue
+
+            critical = push.kind != "adc" and self._is_critical(updated)
+            updated_devices[updated] = updated_devices.get(updated, False) or critical
+
+        for updated, critical in updated_devices.items():
+            self._write_device(updated, critical)
+
+    def _write_device(self, updated: tuple[str, Any], critical: bool) -> None:
+        """Notify device listeners now or at the end of its coalescing window."""
+        if self._coalesce_window <= 0 or critical:
+            self._coalesce_pending.discard(updated)
+            self._notify_device(updated)
+            return
+
+        if updated in self._coalesce_until:
+            # written at the end of the window with the latest state
+            self._coalesce_pending.add(updated)
+            return
+
+        self._notify_device(updated)
+        self._coalesce_until[updated] = self.hass.loop.time() + self._coalesce_window
+        if self._coalesce_timer is None:
+            self._coalesce_timer = self.hass.loop.call_later(
+                self._coalesce_window, self._flush_coalesced
+            )
+
+    def _is_critical(self, updated: tuple[str, Any]) -> bool:
+        """Check if device update must bypass coalescing."""
+        category, key = updated
+        if category == "parts":
+            return True
+        if category == "zones":
+            zone = self._devices.zone(key)
+            return zone is not None and zone.state in CRITICAL_EVENTS
+        return False
+
+    def _notify_device(self, updated: tuple[str, Any]) -> None:
+        """Notify listeners of a single device."""
+        for update_callback in list(self._device_listeners.get(updated, ())):
+            update_callback()
+
+    @callback
+    def _flush_coalesced(self) -> None:
+        """Write devices with pushes coalesced in expired windows."""
+        self._coalesce_timer = None
+        now = self.hass.loop.time()
+        for updated, until in list(self._coalesce_until.items()):
+            if until > now:
+                continue
+            if updated in self._coalesce_pending:
+                # changed again during the window, write and start a new one
+                self._coalesce_pending.discard(updated)
+                self._notify_device(updated)
+                self._coalesce_until[updated] = now + self._coalesce_window
+            else:
+                del self._coalesce_until[updated]
+
+        if self._coalesce_until:
+            self._coalesce_timer = self.hass.loop.call_at(
+                min(self._coalesce_until.values()), self._flush_coalesced
+            )
+
+    async def async_shutdown(self) -> None:
+        """Cancel coalesced writes and shutdown coordinator."""
+        if self._coalesce_timer is not None:
+            self._coalesce_timer.cancel()
+            self._coalesce_timer = None
+        self._coalesce_until.clear()
+        self._coalesce_pending.clear()
+        await super().async_shutdown()
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
@@ -93,10 +329,23 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             hass.data[DOMAIN][KEY_UNSUB_STOP] = unsub
 
     listener = hass.data[DOMAIN][LISTENER_KEY]
-    coordinator = HUBC2000PPDataUpdateCoordinator(hass, host, port)
-    await coordinator.async_config_entry_first_refresh()
+    coordinator = HUBC2000PPDataUpdateCoordinator(
+        hass,
+        host,
+        port,
+        entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+        Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry.entry_id)),
+    )
+    await coordinator.async_load_zone_meta()
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except Exception:
+        await coordinator.client.close()
+        raise
 
-    listener.register_hub(host, coordinator.udp_callback)
+    listener.register_hub(
+        host, coordinator.udp_callback, coordinator.udp_batch_callback
+    )
     _LOGGER.info("HUB '%s:%d' connected, listening for pushes", host, port)
 
     entry.async_on_unload(entry.add_update_listener(update_listener))
@@ -110,6 +359,16 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        # no pushes to the coordinator after shutdown, a reload registers again
+        hass.data[DOMAIN][LISTENER_KEY].unregister_hub(coordinator.host)
+        await coordinator.async_shutdown()
+        await coordinator.client.close()
 
     return unload_ok
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove saved zone metadata of a removed config entry."""
+    store = Store(hass, STORAGE_VERSION, STORAGE_KEY.format(entry.entry_id))
+    await store.async_remove()
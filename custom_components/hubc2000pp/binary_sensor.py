@@ -1,6 +1,5 @@
 """Support for HUB-C2000PP binary sensor."""
 import logging
-from typing import Any
 
 from homeassistant.components.binary_sensor import (
     BinarySensorDeviceClass,
@@ -13,7 +12,8 @@ from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import HUBC2000PPDataUpdateCoordinator
-from .const import DOMAIN, DOOR_EVENTS, FIRE_EVENTS, MOTION_EVENTS
+from .const import BINARY_SENSOR_ON_EVENTS, DOMAIN
+from .hubc2000pp import Zone
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -29,10 +29,10 @@ async def async_setup_entry(
 ) -> None:
     """Set up Bolid sensor."""
     coordinator: HUBC2000PPDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    devices = coordinator.data["zones"]
+    devices = coordinator.data.zones
     entities = []
     for device in devices:
-        if device["type"] in BINARY_SENSORS:
+        if device.type in BINARY_SENSORS:
             entities.append(BinaryDevice(device, coordinator))
 
     async_add_entities(entities)
@@ -45,28 +45,28 @@ class BinaryDevice(
 
     def __init__(
         self,
-        device: dict[str, Any],
+        device: Zone,
         coordinator: HUBC2000PPDataUpdateCoordinator,
     ) -> None:
         """Initialize the Bolid sensor."""
         super().__init__(coordinator)
 
         device_name = self.name
-        device_uid = f'{device["dev"]}.{device["sh"]}'
+        device_uid = f"{device.dev}.{device.sh}"
 
-        if device["type"] == "smokeSensor":
+        if device.type == "smokeSensor":
             device_name = "ДИП-34А"
             device_class = BinarySensorDeviceClass.SMOKE
 
-        if device["type"] == "doorSensor":
+        if device.type == "doorSensor":
             device_name = "с2000-смк"
             device_class = BinarySensorDeviceClass.DOOR
 
-        if device["type"] == "windowSensor":
+        if device.type == "windowSensor":
             device_name = "с2000-смк"
             device_class = BinarySensorDeviceClass.WINDOW
 
-        if device["type"] == "motionSensor":
+        if device.type == "motionSensor":
             device_name = "с2000-ИК"
             device_class = BinarySensorDeviceClass.MOTION
 
@@ -75,38 +75,25 @@ class BinaryDevice(
                 (DOMAIN, device_uid),
             },
             manufacturer="Bolid",
-            model=device["type"],
+            model=device.type,
             name=device_name,
         )
 
-        self._attr_name = device["desc"]
-        self._attr_unique_id = device["uid"]
-        self._type = device["type"]
+        self._attr_name = device.desc
+        self._attr_unique_id = device.uid
+        self._uid = device.uid
+        self._type = device.type
         self._attr_device_class = device_class
+        self._on_events = BINARY_SENSOR_ON_EVENTS.get(device.type, frozenset())
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        device: dict[str, Any] | None = next(
-            (
-                device
-                for device in self.coordinator.data["zones"]
-                if device["uid"] == self.unique_id
-            ),
-            None,
-        )
+        device: Zone | None = self.coordinator.data.zone(self._uid)
 
         if device:
-            state_code = int(device["state"])
-            if device["state"] != "-":
-                if device["type"] == "smokeSensor":
-                    is_on = state_code in FIRE_EVENTS
-
-                if device["type"] in ("doorSensor", "windowSensor"):
-                    is_on = state_code in DOOR_EVENTS
-
-                if device["type"] == "motionSensor":
-                    is_on = state_code in MOTION_EVENTS
+            if device.state is not None:
+                is_on = device.state in self._on_events
 
                 # Call update entry only if data was changed
                 if self._attr_is_on != is_on:
@@ -116,4 +103,9 @@ class BinaryDevice(
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_subscribe_device(
+                "zones", self._uid, self._handle_coordinator_update
+            )
+        )
         self._handle_coordinator_update()
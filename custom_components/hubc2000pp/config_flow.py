@@ -1,22 +1,41 @@
 """Config flow for hubc2000pp integration."""
 from __future__ import annotations
 
+import asyncio
 import enum
+import ipaddress
 import logging
-import socket
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
 
-from .const import DOMAIN
+from .const import (
+    ADC_GROUPS,
+    CONF_ADC_DEADBAND,
+    CONF_ADC_HEARTBEAT,
+    CONF_ADC_MIN_INTERVAL,
+    CONF_COALESCE_WINDOW,
+    DEFAULT_ADC_DEADBAND,
+    DEFAULT_ADC_HEARTBEAT,
+    DEFAULT_ADC_MIN_INTERVAL,
+    DEFAULT_COALESCE_WINDOW,
+    DOMAIN,
+)
+from .hubc2000pp import parse_deadband
 
 _LOGGER = logging.getLogger(__name__)
 
+PING_TIMEOUT = 2
+# Simultaneous PINGs while discovering hubs and max addresses to check
+DISCOVERY_CONCURRENCY = 128
+DISCOVERY_MAX_HOSTS = 4096
+
 # Schema for user form
 HUB_SCHEMA = vol.Schema(
     {
@@ -25,6 +44,14 @@ HUB_SCHEMA = vol.Schema(
     }
 )
 
+# Schema for discovery form, hosts are a subnet or a list of addresses
+DISCOVERY_SCHEMA = vol.Schema(
+    {
+        vol.Required("hosts", default="192.168.1.0/24"): str,
+        vol.Required("port", default=22000): int,
+    }
+)
+
 
 class PingResult(enum.Enum):
     """HUB-C2000PP connect result enum."""
@@ -34,6 +61,24 @@ class PingResult(enum.Enum):
     bad_response = 2
 
 
+class PingProtocol(asyncio.DatagramProtocol):
+    """Receive PING reply."""
+
+    def __init__(self, reply: asyncio.Future[bytes]) -> None:
+        """Init protocol data."""
+        self._reply = reply
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        """Handle reply."""
+        if not self._reply.done():
+            self._reply.set_result(data)
+
+    def error_received(self, exc: Exception) -> None:
+        """Handle error (e.g. ICMP port unreachable)."""
+        if not self._reply.done():
+            self._reply.set_exception(exc)
+
+
 class HubC2000PP:
     """Hub class."""
 
@@ -42,21 +87,30 @@ class HubC2000PP:
         self.host = host
         self.port = port
 
-    async def ping(self) -> PingResult:
+    async def ping(self, timeout: float = PING_TIMEOUT) -> PingResult:
         """Test if we can access with the host."""
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.settimeout(2)
-        sock.sendto(b"PING", (self.host, self.port))
+        loop = asyncio.get_running_loop()
+        reply_future: asyncio.Future[bytes] = loop.create_future()
+        try:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: PingProtocol(reply_future),
+                remote_addr=(self.host, self.port),
+            )
+        except OSError:
+            return PingResult.cant_connect
+
         try:
-            reply = sock.recv(128)
-            sock.close()
-        except TimeoutError:
+            transport.sendto(b"PING")
+            reply = await asyncio.wait_for(reply_future, timeout=timeout)
+        except (asyncio.TimeoutError, OSError):
             return PingResult.cant_connect
+        finally:
+            transport.close()
 
         if not reply:
             return PingResult.cant_connect
 
-        result = reply.decode("utf-8")
+        result = reply.decode("utf-8", errors="replace")
         if result == "PONG":
             return PingResult.success
 
@@ -64,6 +118,44 @@ class HubC2000PP:
         return PingResult.bad_response
 
 
+def parse_hosts(hosts: str) -> list[str]:
+    """Parse subnets and addresses separated by comma or space.
+
+    Raises ValueError on a bad subnet or too many addresses.
+    """
+    result: list[str] = []
+    for item in hosts.replace(",", " ").split():
+        if "/" in item:
+            network = ipaddress.ip_network(item, strict=False)
+            if network.num_addresses > DISCOVERY_MAX_HOSTS:
+                raise ValueError(f"Too many addresses in {item}")
+            result.extend(str(address) for address in network.hosts())
+        else:
+            result.append(item)
+
+        if len(result) > DISCOVERY_MAX_HOSTS:
+            raise ValueError("Too many addresses")
+
+    return list(dict.fromkeys(result))
+
+
+async def discover_hubs(hosts: list[str], port: int) -> list[str]:
+    """PING hosts concurrently, return hosts which replied PONG."""
+    semaphore = asyncio.Semaphore(DISCOVERY_CONCURRENCY)
+
+    async def ping(host: str) -> bool:
+        async with semaphore:
+            return await HubC2000PP(host, port).ping() == PingResult.success
+
+    results = await asyncio.gather(
+        *(ping(host) for host in hosts), return_exceptions=True
+    )
+    for host, result in zip(hosts, results):
+        if isinstance(result, Exception):
+            _LOGGER.debug("HUB-C2000PP discovery of %s failed: %s", host, result)
+    return [host for host, found in zip(hosts, results) if found is True]
+
+
 async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
     """Validate the user input allows us to connect."""
 
@@ -83,10 +175,30 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    def __init__(self) -> None:
+        """Init flow data."""
+        self._discovered: list[str] = []
+        self._discovery_port = 22000
+        self._discovered_hub: dict[str, Any] = {}
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> OptionsFlowHandler:
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler()
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
+        return self.async_show_menu(step_id="user", menu_options=["manual", "discover"])
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Handle hub address entered by user."""
         errors: dict[str, str] = {}
         if user_input is not None:
             try:
@@ -102,7 +214,157 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 return self.async_create_entry(title=info["title"], data=user_input)
 
         return self.async_show_form(
-            step_id="user", data_schema=HUB_SCHEMA, errors=errors
+            step_id="manual", data_schema=HUB_SCHEMA, errors=errors
+        )
+
+    async def async_step_discover(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Search hubs in subnet or address list."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                hosts = parse_hosts(user_input["hosts"])
+            except ValueError:
+                errors["hosts"] = "invalid_hosts"
+            else:
+                configured = {
+                    entry.data["host"] for entry in self._async_current_entries()
+                }
+                found = await discover_hubs(
+                    [host for host in hosts if host not in configured],
+                    user_input["port"],
+                )
+                if found:
+                    self._discovered = found
+                    self._discovery_port = user_input["port"]
+                    return await self.async_step_select()
+                errors["base"] = "no_hubs_found"
+
+        return self.async_show_form(
+            step_id="discover", data_schema=DISCOVERY_SCHEMA, errors=errors
+        )
+
+    async def async_step_select(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Select discovered hubs to add."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            selected = user_input["hosts"]
+            if selected:
+                # one entry per flow, the other hubs are offered as discovered
+                for host in selected[1:]:
+                    self.hass.async_create_task(
+                        self.hass.config_entries.flow.async_init(
+                            DOMAIN,
+                            context={
+                                "source": config_entries.SOURCE_INTEGRATION_DISCOVERY
+                            },
+                            data={"host": host, "port": self._discovery_port},
+                        )
+                    )
+                return self.async_create_entry(
+                    title="HUB-C2000PP",
+                    data={"host": selected[0], "port": self._discovery_port},
+                )
+            errors["base"] = "no_hubs_selected"
+
+        return self.async_show_form(
+            step_id="select",
+            data_schema=vol.Schema(
+                {
+                    vol.Required("hosts", default=self._discovered): cv.multi_select(
+                        self._discovered
+                    ),
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_integration_discovery(
+        self, discovery_info: dict[str, Any]
+    ) -> FlowResult:
+        """Offer hub selected in discovery for confirmation."""
+        self._async_abort_entries_match({"host": discovery_info["host"]})
+        self._discovered_hub = discovery_info
+        self.context["title_placeholders"] = {"host": discovery_info["host"]}
+        return await self.async_step_discovery_confirm()
+
+    async def async_step_discovery_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Check and add discovered hub like one entered by user."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            self._async_abort_entries_match({"host": self._discovered_hub["host"]})
+            try:
+                info = await validate_input(self.hass, self._discovered_hub)
+            except CannotConnect:
+                errors["base"] = "cannot_connect"
+            except BadResponse:
+                errors["base"] = "bad_response"
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Unexpected exception")
+                errors["base"] = "unknown"
+            else:
+                return self.async_create_entry(
+                    title=info["title"], data=self._discovered_hub
+                )
+
+        return self.async_show_form(
+            step_id="discovery_confirm",
+            description_placeholders={"host": self._discovered_hub["host"]},
+            errors=errors,
+        )
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle push coalescing and ADC filter options."""
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            for group in ADC_GROUPS:
+                key = CONF_ADC_DEADBAND.format(group)
+                try:
+                    parse_deadband(user_input[key])
+                except ValueError:
+                    errors[key] = "invalid_deadband"
+            if not errors:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        schema: dict[Any, Any] = {
+            vol.Required(
+                CONF_COALESCE_WINDOW,
+                default=options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+            ): vol.All(vol.Coerce(float), vol.Range(min=0, max=10)),
+            vol.Required(
+                CONF_ADC_HEARTBEAT,
+                default=options.get(CONF_ADC_HEARTBEAT, DEFAULT_ADC_HEARTBEAT),
+            ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        }
+        for group in ADC_GROUPS:
+            deadband = CONF_ADC_DEADBAND.format(group)
+            min_interval = CONF_ADC_MIN_INTERVAL.format(group)
+            schema[
+                vol.Required(
+                    deadband, default=options.get(deadband, DEFAULT_ADC_DEADBAND[group])
+                )
+            ] = str
+            schema[
+                vol.Required(
+                    min_interval,
+                    default=options.get(min_interval, DEFAULT_ADC_MIN_INTERVAL[group]),
+                )
+            ] = vol.All(vol.Coerce(int), vol.Range(min=0))
+
+        return self.async_show_form(
+            step_id="init", data_schema=vol.Schema(schema), errors=errors
         )
 
 
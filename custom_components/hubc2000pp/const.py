@@ -1,11 +1,65 @@
 """Constants for the hubc2000pp integration."""
 
+from homeassistant.components.alarm_control_panel import AlarmControlPanelState
+
 DOMAIN = "hubc2000pp"
 
 KEY_UNSUB_STOP = "unsub_stop"
 KEY_SETUP_LOCK = "setup_lock"
 LISTENER_KEY = "listener"
 
+# Adaptive poll interval (seconds): fast after a push gap or failure, backs
+# off up to max while polls confirm that pushes deliver every change
+POLL_INTERVAL_FAST = 10
+POLL_INTERVAL_MAX = 300
+
+# Zone metadata received with binary zone pages is saved per config entry,
+# so after restart the first sync transfers only states
+STORAGE_VERSION = 1
+STORAGE_KEY = DOMAIN + ".{}.zone_meta"
+STORAGE_SAVE_DELAY = 10
+
+# Pushes of a device within this window (s) are written to HA once,
+# critical events are written at once, 0 disables coalescing
+CONF_COALESCE_WINDOW = "coalesce_window"
+DEFAULT_COALESCE_WINDOW = 0.5
+
+# ADC values are written to HA only if changed more than the deadband of the
+# sensor group ("0.1" absolute or "1%" of the last value) and not more often
+# than the min interval (s), the latest value is written at least once per
+# heartbeat (s) even if unchanged
+CONF_ADC_HEARTBEAT = "adc_heartbeat"
+CONF_ADC_DEADBAND = "{}_deadband"
+CONF_ADC_MIN_INTERVAL = "{}_min_interval"
+DEFAULT_ADC_HEARTBEAT = 900
+ADC_GROUPS = {
+    "climate": ("temperatureSensor", "humiditySensor"),
+    "power": (
+        "ripOutputSensor",
+        "ripCurrentSensor",
+        "ripBatteryVoltageSensor",
+        "ripBatteryLevelSensor",
+        "ripInputVoltageSensor",
+    ),
+    "air": ("carbonMonoxideSensor", "soundSensor"),
+    "counter": ("counterSensor", "counterTotalSensor", "counterTotalIncSensor"),
+    "generic": ("genericAdcSensor",),
+}
+DEFAULT_ADC_DEADBAND = {
+    "climate": "0.1",
+    "power": "1%",
+    "air": "1%",
+    "counter": "0",
+    "generic": "0",
+}
+DEFAULT_ADC_MIN_INTERVAL = {
+    "climate": 30,
+    "power": 60,
+    "air": 10,
+    "counter": 0,
+    "generic": 0,
+}
+
 DEVICE_EVENTS_DICT = {
     0: "Неизвестный статус",
     1: "Восстановление сети 220 В",
@@ -230,55 +284,97 @@ DEVICE_STATUSES_DICT = {
     251: "Связь с прибором восстановлена",
 }
 
-FIRE_EVENTS = [19, 37, 40, 44, 76]
-DOOR_EVENTS = [3, 15, 18, 27, 119, 149, 216]
-MOTION_EVENTS = [3, 15, 18, 27, 119, 149, 216]
-ARMED_EVENTS = [
-    1,
-    24,
-    35,
-    39,
-    47,
-    72,
-    78,
-    80,
-    83,
-    91,
-    123,
-    188,
-    191,
-    195,
-    199,
-    218,
-]
-ARMING_EVENTS = [23]
-DISARMED_EVENTS = [109, 112, 117, 119]
+# Codes are one byte, statuses take precedence over events with the same code
+DEVICE_CODE_COUNT = 256
+# Options and code -> label table shared by all status sensors
+DEVICE_STATUS_OPTIONS = tuple(
+    dict.fromkeys([*DEVICE_STATUSES_DICT.values(), *DEVICE_EVENTS_DICT.values()])
+)
+DEVICE_STATUS_LABELS = tuple(
+    DEVICE_STATUSES_DICT.get(code)
+    or DEVICE_EVENTS_DICT.get(code, DEVICE_STATUSES_DICT[0])
+    for code in range(DEVICE_CODE_COUNT)
+)
+
+FIRE_EVENTS = frozenset({19, 37, 40, 44, 76})
+DOOR_EVENTS = frozenset({3, 15, 18, 27, 119, 149, 216})
+MOTION_EVENTS = frozenset({3, 15, 18, 27, 119, 149, 216})
+ARMED_EVENTS = frozenset(
+    {
+        1,
+        24,
+        35,
+        39,
+        47,
+        72,
+        78,
+        80,
+        83,
+        91,
+        123,
+        188,
+        191,
+        195,
+        199,
+        218,
+    }
+)
+ARMING_EVENTS = frozenset({23})
+DISARMED_EVENTS = frozenset({109, 112, 117, 119})
+
+ALARM_EVENTS = frozenset(
+    {
+        3,
+        18,
+        27,
+        33,
+        37,
+        40,
+        44,
+        45,
+        58,
+        79,
+        119,
+        137,
+        138,
+        139,
+        141,
+        144,
+        145,
+        146,
+        147,
+        149,
+        161,
+        214,
+        229,
+        230,
+        250,
+        252,
+    }
+)
+
+# Zone codes written to HA at once, even during push coalescing
+CRITICAL_EVENTS = FIRE_EVENTS | ALARM_EVENTS
+
+# Binary sensor type -> state codes meaning "on"
+BINARY_SENSOR_ON_EVENTS = {
+    "smokeSensor": FIRE_EVENTS,
+    "doorSensor": DOOR_EVENTS,
+    "windowSensor": DOOR_EVENTS,
+    "motionSensor": MOTION_EVENTS,
+}
+
+
+def _partition_state(code: int) -> AlarmControlPanelState:
+    """Classify partition state code, anything unknown is triggered."""
+    if code in ARMED_EVENTS:
+        return AlarmControlPanelState.ARMED_AWAY
+    if code in ARMING_EVENTS:
+        return AlarmControlPanelState.ARMING
+    if code in DISARMED_EVENTS:
+        return AlarmControlPanelState.DISARMED
+    return AlarmControlPanelState.TRIGGERED
+
 
-ALARM_EVENTS = [
-    3,
-    18,
-    27,
-    33,
-    37,
-    40,
-    44,
-    45,
-    58,
-    79,
-    119,
-    137,
-    138,
-    139,
-    141,
-    144,
-    145,
-    146,
-    147,
-    149,
-    161,
-    214,
-    229,
-    230,
-    250,
-    252,
-]
+# Partition state code -> alarm panel state
+PARTITION_STATES = tuple(_partition_state(code) for code in range(DEVICE_CODE_COUNT))
@@ -0,0 +1,35 @@
+"""Diagnostics support for hubc2000pp."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import HUBC2000PPDataUpdateCoordinator
+from .const import DOMAIN, LISTENER_KEY
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics of a config entry."""
+    coordinator: HUBC2000PPDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    listener = hass.data[DOMAIN].get(LISTENER_KEY)
+    push_sequence = coordinator.push_sequence
+    return {
+        "entry": {"data": dict(entry.data), "options": dict(entry.options)},
+        "dedup": listener.dedup_stats if listener is not None else None,
+        "poll": {
+            "update_interval": coordinator.update_interval.total_seconds(),
+            "poll_reason": coordinator.poll_reason,
+        },
+        "push_sequence": {
+            "last": push_sequence.last,
+            "gaps": push_sequence.gaps,
+            "lost": push_sequence.lost,
+            "reordered": push_sequence.reordered,
+            "restarts": push_sequence.restarts,
+        },
+        "devices": coordinator.data.as_dict(),
+    }
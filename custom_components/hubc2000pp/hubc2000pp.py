@@ -1,110 +1,518 @@
 """The HUB-C2000PP service utils."""
+from __future__ import annotations
 
 import asyncio
-from contextlib import suppress
+from collections.abc import Awaitable, Callable, Collection, Iterable
+from contextlib import AsyncExitStack, suppress
+from dataclasses import asdict, dataclass
 import logging
 import socket
-from typing import Any
+import time
+from typing import Any, NamedTuple, TypeVar
 
 import aioudp
 
-SEP_STRING = "__DLM__"
+from .parser import (
+    SEP_STRING,
+    ParsedRecords,
+    Partition,
+    RecordError,
+    Relay,
+    Zone,
+    ZoneMeta,
+    decode_zone_states,
+    parse_adc,
+    parse_code,
+    parse_records,
+)
 
 _LOGGER = logging.getLogger(__name__)
 LISTEN_ADDRESS = "0.0.0.0"
-
-
-def update_device(message, devices):
-    """Parse push message from hub, find and update device."""
+# script.js sends every push twice, copies closer than this (s) are dropped
+DEDUP_WINDOW = 0.5
+# push sequence numbers this far behind the last one mean a script restart
+PUSH_RESTART_JUMP = 1000
+COMMAND_TIMEOUT = 1
+MAX_REQUEST_ID = 65535
+# commands for relays/partitions queued within this time (s) are sent at once
+BATCH_DELAY = 0.02
+# zones per getZones and getZonesMeta page, a zone record with a Cyrillic
+# description takes about 100 bytes, so a page fits in one 1472 byte UDP
+# payload and isn't fragmented
+ZONES_PAGE_SIZE = 10
+ZONES_PAGE_RETRIES = 2
+# getChanges pages (up to 10 changes each) requested per poll, the rest is
+# requested by the next poll
+CHANGES_MAX_PAGES = 50
+# zone pages requested at once, more in flight only makes replies get lost
+ZONES_PAGE_WINDOW = 8
+# zones per getZonesBin page, states and ADC values take at most 12 bytes per
+# zone, so a page is at most 1.3 kB of base64 and isn't fragmented even if
+# all its zones have ADC values, metadata is requested by getZonesMeta pages
+# of ZONES_PAGE_SIZE zones
+ZONES_BIN_PAGE_SIZE = 80
+# max datagrams read from the listener socket per loop tick
+DRAIN_MAX_DATAGRAMS = 256
+MAX_DATAGRAM_SIZE = 65535
+DRAIN_RCVBUF = 1 << 20
+COMMAND_ERRORS = (asyncio.TimeoutError, aioudp.exceptions.AioUDPError, OSError)
+
+_PageT = TypeVar("_PageT")
+
+
+def parse_deadband(value: str) -> tuple[float, bool]:
+    """Parse deadband "0.1" or "1%", return (value, is percent).
+
+    Raises ValueError if malformed or negative.
+    """
+    value = value.strip()
+    percent = value.endswith("%")
+    deadband = float(value[:-1] if percent else value)
+    if not deadband >= 0 or deadband == float("inf"):
+        raise ValueError(f"Invalid deadband {value}")
+    return deadband, percent
+
+
+@dataclass(slots=True, frozen=True)
+class AdcFilter:
+    """Deadband and rate limit of ADC values written to HA."""
+
+    deadband: float = 0
+    percent: bool = False
+    min_interval: float = 0
+    heartbeat: float = 0
+
+    def significant(self, old: float, new: float) -> bool:
+        """Check if new value is out of the deadband around old one."""
+        limit = abs(old) * self.deadband / 100 if self.percent else self.deadband
+        return abs(new - old) > limit
+
+    def delay(self, old: float, new: float, since_write: float | None) -> float | None:
+        """Return seconds to wait before writing new value, None to skip it.
+
+        since_write is the time since the last write, None if never written.
+        Once per heartbeat the value is written even if it didn't change.
+        """
+        if since_write is None:
+            return 0
+        if not (self.heartbeat and since_write >= self.heartbeat) and (
+            new == old or not self.significant(old, new)
+        ):
+            return None
+        return max(0, self.min_interval - since_write)
+
+
+class DeviceStore:
+    """Zones, partitions and relays of a hub indexed by uid and numeric id."""
+
+    _KEYS = ("zones", "parts", "relays", "error")
+
+    def __init__(self) -> None:
+        """Init empty store."""
+        self.zones: list[Zone] = []
+        self.parts: list[Partition] = []
+        self.relays: list[Relay] = []
+        self.error: str | bool = False
+        # malformed records skipped while parsing replies
+        self.record_errors: list[RecordError] = []
+        # (epoch, revision) of script data the store is in sync with
+        self.revision: tuple[str, int] | None = None
+        self._zones_by_uid: dict[str, Zone] = {}
+        self._zones_by_id: dict[int, Zone] = {}
+        self._parts_by_id: dict[int, Partition] = {}
+        self._relays_by_id: dict[int, Relay] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        """Dict-like access kept for compatibility ("zones", "parts", ...)."""
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        """Dict-like assignment, only "error" can be set this way."""
+        if key != "error":
+            raise KeyError(key)
+        self.error = value
+
+    def __contains__(self, key: object) -> bool:
+        """Check dict-like key."""
+        return key in self._KEYS
+
+    def add_zone(self, zone: Zone) -> None:
+        """Add zone to store."""
+        self.zones.append(zone)
+        self._zones_by_uid[zone.uid] = zone
+        self._zones_by_id[zone.id] = zone
+
+    def add_part(self, part: Partition) -> None:
+        """Add partition to store."""
+        self.parts.append(part)
+        self._parts_by_id[part.id] = part
+
+    def add_relay(self, relay: Relay) -> None:
+        """Add relay to store."""
+        self.relays.append(relay)
+        self._relays_by_id[relay.id] = relay
+
+    def add_records(self, parsed: ParsedRecords) -> None:
+        """Add parsed devices to store and keep their record errors."""
+        for zone in parsed.zones:
+            self.add_zone(zone)
+        for part in parsed.parts:
+            self.add_part(part)
+        for relay in parsed.relays:
+            self.add_relay(relay)
+        self.record_errors.extend(parsed.errors)
+
+    def zone(self, uid: str) -> Zone | None:
+        """Get zone by uid ("id.sh.part.stype")."""
+        return self._zones_by_uid.get(uid)
+
+    def zone_by_id(self, zone_id: int) -> Zone | None:
+        """Get zone by numeric id."""
+        return self._zones_by_id.get(zone_id)
+
+    def part(self, part_id: int) -> Partition | None:
+        """Get partition by numeric id."""
+        return self._parts_by_id.get(part_id)
+
+    def relay(self, relay_id: int) -> Relay | None:
+        """Get relay by numeric id."""
+        return self._relays_by_id.get(relay_id)
+
+    def count_changed(self, other: DeviceStore) -> int:
+        """Count devices whose state differs from the same device in other."""
+        changed = 0
+        for zone in self.zones:
+            old = other.zone(zone.uid)
+            if old is not None and old.state != zone.state:
+                changed += 1
+        for part in self.parts:
+            old = other.part(part.id)
+            if old is not None and old.state != part.state:
+                changed += 1
+        for relay in self.relays:
+            old = other.relay(relay.id)
+            if old is not None and old.state != relay.state:
+                changed += 1
+        return changed
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return data as plain dicts (e.g. for diagnostics)."""
+        return {
+            "zones": [asdict(zone) for zone in self.zones],
+            "relays": [asdict(relay) for relay in self.relays],
+            "parts": [asdict(part) for part in self.parts],
+            "error": self.error,
+            "record_errors": [err._asdict() for err in self.record_errors],
+        }
+
+
+class Push(NamedTuple):
+    """Push message from hub."""
+
+    kind: str
+    uid: str
+    state: str
+    seq: int | None
+
+
+def parse_push(message: str) -> Push | None:
+    """Parse push message "type:uid:state[:seq]".
+
+    Type can be zone, relay, part or adc (state is the ADC or counter value).
+    Returns None if malformed.
+    """
     push_data = message.split(":")
-
-    # message format: "type:uid:state" (type can be zone, relay, part)
     if len(push_data) == 3:
-        uid = push_data[1]
-        state = push_data[2]
-        if push_data[0] == "zone":
-            zones = devices["zones"]
-            zone = next((x for x in zones if x["uid"] == uid), None)
-            if zone:
-                zone["state"] = state
-
-        if push_data[0] == "part":
-            parts = devices["parts"]
-            part = next((x for x in parts if x["id"] == int(uid)), None)
-            if part:
-                part["stat"] = state
-
-        if push_data[0] == "relay":
-            relays = devices["relays"]
-            relay = next((x for x in relays if x["id"] == int(uid)), None)
-            if relay:
-                relay["stat"] = state
-
-
-async def switch_relay(relay: int, state: bool, host: str, port: int) -> bool:
-    """Switch relay on or off."""
-    try:
-        async with aioudp.connect(host, port) as connection:
-            # first is "BAD_CMD" because of "trash" from aioudp
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
+        return Push(push_data[0], push_data[1], push_data[2], None)
+    if len(push_data) == 4 and push_data[3].isdecimal():
+        return Push(push_data[0], push_data[1], push_data[2], int(push_data[3]))
+    _LOGGER.debug("HUB-C2000PP malformed push: %s", message)
+    return None
 
-            if state:
-                cmd = f"relay_on:{relay}".encode()
-            else:
-                cmd = f"relay_off:{relay}".encode()
 
-            await connection.send(cmd)
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
-            reply = result.decode("utf-8")
+def apply_push(push: Push, devices: DeviceStore | None) -> tuple[str, Any] | None:
+    """Find and update device of push.
 
-            if reply != "RELAY_OK":
-                return False
+    Returns (category, key) of the updated device, where key is the zone uid
+    or the partition/relay id, or None if no known device was updated.
+    """
+    if devices is None:
+        return None
 
+    try:
+        return _apply_push(push, devices)
+    except ValueError:
+        _LOGGER.debug("HUB-C2000PP malformed push: %s", push)
+        return None
+
+
+def _apply_push(push: Push, devices: DeviceStore) -> tuple[str, Any] | None:
+    """Update device of push, raises ValueError if push is malformed."""
+    if push.kind == "zone":
+        zone = devices.zone(push.uid)
+        if zone:
+            zone.state = parse_code(push.state)
+            return ("zones", push.uid)
+
+    if push.kind == "adc":
+        zone = devices.zone(push.uid)
+        if zone:
+            zone.adc = parse_adc(push.state)
+            return ("zones", push.uid)
+
+    if push.kind == "part":
+        part = devices.part(int(push.uid))
+        if part:
+            part.state = int(push.state)
+            return ("parts", part.id)
+
+    if push.kind == "relay":
+        relay = devices.relay(int(push.uid))
+        if relay:
+            relay.state = push.state == "true"
+            return ("relays", relay.id)
+
+    return None
+
+
+def update_device(message, devices: DeviceStore | None) -> tuple[str, Any] | None:
+    """Parse push message from hub, find and update device."""
+    push = parse_push(message)
+    if push is None:
+        return None
+    return apply_push(push, devices)
+
+
+class PushSequence:
+    """Sequence numbers of hub pushes, used to detect lost datagrams."""
+
+    def __init__(self) -> None:
+        """Init sequence data."""
+        self.last: int | None = None
+        self.gaps = 0
+        self.lost = 0
+        self.reordered = 0
+        self.restarts = 0
+
+    def check(self, seq: int) -> bool:
+        """Register push sequence number, return True if pushes were lost.
+
+        The last number only moves forward, a lower one is a late or
+        duplicate datagram and is ignored. Only 1 or a jump back by more
+        than PUSH_RESTART_JUMP means the script was restarted, its pushes
+        before the restart can't be accounted for, so it's reported as well.
+        """
+        last = self.last
+        if last is None or seq == last + 1:
+            self.last = seq
+            return False
+
+        if seq > last:
+            self.last = seq
+            self.gaps += 1
+            self.lost += seq - last - 1
             return True
-    except asyncio.TimeoutError:
-        return False
-
 
-class RelayFailed(Exception):
-    """Raised when an switching relay has failed."""
+        if seq == 1 or last - seq > PUSH_RESTART_JUMP:
+            self.last = seq
+            self.restarts += 1
+            return True
 
+        if seq < last:
+            self.reordered += 1
+        return False
 
-async def arm_partition(part, host, port) -> bool:
-    """ARM specified partition."""
-    try:
-        async with aioudp.connect(host, port) as connection:
-            # first is "BAD_CMD" because of "trash" from aioudp
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
 
-            await connection.send(f"arm:{part}".encode())
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
-            reply = result.decode("utf-8")
+class HUBC2000PPCommandClient:
+    """Long-lived command connection to HUB-C2000PP service.
 
-            if reply != "ARM_OK":
-                return False
+    The connection is opened on first use and the "BAD_CMD" reply to aioudp's
+    "trash" datagram is consumed once. Then the script is probed for request
+    id support ("#id#cmd" answered with "#id#reply"). If supported, any number
+    of commands share the socket and replies are matched by id. Otherwise
+    commands are serialized and the connection is dropped on timeout so that
+    a late reply can't be taken for the answer to the next command.
+    The connection is reopened lazily after errors.
+    """
 
-            return True
-    except asyncio.TimeoutError:
-        return False
+    def __init__(self, host: str, port: int, timeout: float = COMMAND_TIMEOUT) -> None:
+        """Init client data."""
+        self._host = host
+        self._port = port
+        self._timeout = timeout
+        self._lock = asyncio.Lock()
+        self._connect_lock = asyncio.Lock()
+        self._stack: AsyncExitStack | None = None
+        self._connection: aioudp.Connection | None = None
+        self._reader: asyncio.Task | None = None
+        self._correlated = False
+        self._request_id = 0
+        self._pending: dict[bytes, asyncio.Future[bytes]] = {}
+        self._waiter: asyncio.Future[bytes] | None = None
 
+    @property
+    def connected(self) -> bool:
+        """Return True if connection is open."""
+        return self._connection is not None
 
-async def disarm_partition(part, host, port) -> bool:
-    """DISARM specified partition."""
-    try:
-        async with aioudp.connect(host, port) as connection:
+    @property
+    def correlated(self) -> bool:
+        """Return True if hub script supports request ids."""
+        return self._correlated
+
+    async def connect(self) -> None:
+        """Open connection if it is not opened yet."""
+        await self._get_connection()
+
+    async def _get_connection(self) -> aioudp.Connection:
+        """Return opened connection, connect if needed."""
+        async with self._connect_lock:
+            if self._connection is None:
+                await self._connect()
+            return self._connection
+
+    async def _connect(self) -> None:
+        """Open connection, flush reply to aioudp "trash" and probe request ids."""
+        stack = AsyncExitStack()
+        try:
+            connection = await stack.enter_async_context(
+                aioudp.connect(self._host, self._port)
+            )
             # first is "BAD_CMD" because of "trash" from aioudp
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
+            await asyncio.wait_for(connection.recv(), timeout=self._timeout)
+
+            # old scripts reply "BAD_CMD" to a command with request id
+            await connection.send(b"#0#PING")
+            reply = await asyncio.wait_for(connection.recv(), timeout=self._timeout)
+        except BaseException:
+            await stack.aclose()
+            raise
+
+        self._correlated = reply == b"#0#PONG"
+        self._stack = stack
+        self._connection = connection
+        self._reader = asyncio.create_task(self._read(connection))
+        _LOGGER.debug(
+            "Command connection to %s:%d opened, request ids %s",
+            self._host,
+            self._port,
+            "supported" if self._correlated else "not supported",
+        )
 
-            await connection.send(f"disarm:{part}".encode())
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
-            reply = result.decode("utf-8")
+    async def _disconnect(self) -> None:
+        """Close connection if opened and fail waiting requests."""
+        stack = self._stack
+        reader = self._reader
+        self._stack = None
+        self._connection = None
+        self._reader = None
+        if reader is not None and reader is not asyncio.current_task():
+            reader.cancel()
+        if stack is not None:
+            await stack.aclose()
+
+        error = aioudp.exceptions.ConnectionClosedError("The connection is closed")
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_exception(error)
+
+    async def _drop(self, connection: aioudp.Connection) -> None:
+        """Close connection after an error unless it was replaced already."""
+        async with self._connect_lock:
+            if self._connection is connection:
+                await self._disconnect()
+
+    async def _read(self, connection: aioudp.Connection) -> None:
+        """Receive replies and pass them to waiting requests."""
+        try:
+            async for data in connection:
+                self._dispatch(data)
+        finally:
+            await self._drop(connection)
+
+    def _dispatch(self, data: bytes) -> None:
+        """Resolve request waiting for reply."""
+        if self._correlated and data.startswith(b"#"):
+            end = data.find(b"#", 1)
+            if end > 0:
+                future = self._pending.pop(data[1:end], None)
+                if future is not None and not future.done():
+                    future.set_result(data[end + 1 :])
+                else:
+                    _LOGGER.debug("Late reply from %s: %s", self._host, data)
+                return
+
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(data)
+            return
 
-            if reply != "DISARM_OK":
-                return False
+        _LOGGER.debug("Unexpected reply from %s: %s", self._host, data)
+
+    async def close(self) -> None:
+        """Close connection."""
+        async with self._connect_lock:
+            await self._disconnect()
+
+    async def request(self, cmd: bytes, timeout: float | None = None) -> str:
+        """Send command and return decoded reply.
+
+        Raises one of COMMAND_ERRORS if the hub can't be reached.
+        """
+        if timeout is None:
+            timeout = self._timeout
+
+        connection = await self._get_connection()
+        if self._correlated:
+            result = await self._request_correlated(connection, cmd, timeout)
+        else:
+            result = await self._request_serialized(cmd, timeout)
+
+        return result.decode("utf-8")
+
+    async def _request_correlated(
+        self, connection: aioudp.Connection, cmd: bytes, timeout: float
+    ) -> bytes:
+        """Send command with request id, other requests may be in flight."""
+        self._request_id = self._request_id % MAX_REQUEST_ID + 1
+        request_id = str(self._request_id).encode()
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await connection.send(b"#" + request_id + b"#" + cmd)
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            # late reply will be dropped by id, no need to reconnect
+            raise
+        except COMMAND_ERRORS:
+            await self._drop(connection)
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _request_serialized(self, cmd: bytes, timeout: float) -> bytes:
+        """Send command without request id, one at a time."""
+        async with self._lock:
+            # connection may have been replaced while waiting for the lock
+            connection = await self._get_connection()
+            future = asyncio.get_running_loop().create_future()
+            self._waiter = future
+            try:
+                await connection.send(cmd)
+                return await asyncio.wait_for(future, timeout=timeout)
+            except COMMAND_ERRORS:
+                await self._drop(connection)
+                raise
+            finally:
+                self._waiter = None
 
-            return True
-    except asyncio.TimeoutError:
-        return False
+
+class RelayFailed(Exception):
+    """Raised when an switching relay has failed."""
 
 
 class ArmFailed(Exception):
@@ -115,106 +523,531 @@ class DisarmFailed(Exception):
     """Raised when a disarm has failed."""
 
 
-async def get_devices(host, port):
-    """Get devices from HUB-C2000PP service."""
-    devices = {"zones": [], "relays": [], "parts": [], "error": False}
+async def _batch_command(
+    command: str, targets: Iterable[int], ok_reply: str, client: HUBC2000PPCommandClient
+) -> bool:
+    """Send command for several relays/partitions.
 
+    Scripts with request id support take a list of ids in one command
+    ("relay_on:1,2,5"), for older scripts a command per target is sent.
+    """
+    targets = sorted(set(targets))
     try:
-        async with aioudp.connect(host, port) as connection:
-            # first is "BAD_CMD" because of "trash" from aioudp
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
-
-            await connection.send(b"getZones")
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
-            result = result.decode("utf-8")
-
-            if result == "BAD_CMD":
-                devices["error"] = "Server returned BAD_CMD"
-                return devices
-
-            if result:
-                lines = result.split(SEP_STRING)
-                for line in lines:
-                    device_info = line.split(":")
-                    if len(device_info) == 10:
-                        if device_info[0] == "zone":
-                            uid = f"{int(device_info[1])}.{device_info[2]}.{device_info[3]}.{device_info[4]}"
-                            adc = device_info[6]
-                            if adc and adc != "-":
-                                adc = round(float(device_info[6]), 2)
-                            device = {
-                                "id": int(device_info[1]),
-                                "sh": device_info[2],
-                                "part": device_info[3],
-                                "stype": device_info[4],
-                                "state": device_info[5],
-                                "adc": adc,
-                                "type": device_info[7],
-                                "dev": device_info[8],
-                                "desc": device_info[9],
-                                "uid": uid,
-                            }
-                            devices["zones"].append(device)
-                            continue
-
-                    devices["error"] = "Unexpected server reply"
-
-            await connection.send(b"getParts")
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
-            result = result.decode("utf-8")
-
-            if result == "BAD_CMD":
-                devices["error"] = "Server returned BAD_CMD"
-                return devices
-
-            if result:
-                lines = result.split(SEP_STRING)
-                for line in lines:
-                    device_info = line.split(":")
-                    if len(device_info) == 4:
-                        if device_info[0] == "part":
-                            uid = f"partition_{int(device_info[1])}"
-                            device = {
-                                "id": int(device_info[1]),
-                                "stat": device_info[2],
-                                "desc": device_info[3],
-                                "uid": uid,
-                            }
-                            if device["stat"] == 0:
-                                continue
-                            devices["parts"].append(device)
-                            continue
-
-                    devices["error"] = "Unexpected server reply"
-
-            await connection.send(b"getRelays")
-            result = await asyncio.wait_for(connection.recv(), timeout=1)
-            result = result.decode("utf-8")
-
-            if result == "BAD_CMD":
-                devices["error"] = "Server returned BAD_CMD"
-                return devices
-
-            if result:
-                lines = result.split(SEP_STRING)
-                for line in lines:
-                    device_info = line.split(":")
-                    if len(device_info) == 4:
-                        if device_info[0] == "relay":
-                            device = {
-                                "id": int(device_info[1]),
-                                "stat": device_info[2],
-                                "desc": device_info[3],
-                            }
-                            devices["relays"].append(device)
-                            continue
-
-                    devices["error"] = "Unexpected server reply"
+        await client.connect()
+        if client.correlated:
+            cmds = [f"{command}:{','.join(str(target) for target in targets)}"]
+        else:
+            cmds = [f"{command}:{target}" for target in targets]
+
+        replies = [await client.request(cmd.encode()) for cmd in cmds]
+    except COMMAND_ERRORS:
+        return False
 
-        return devices
+    return all(reply == ok_reply for reply in replies)
+
+
+async def switch_relays(
+    relays: Iterable[int], state: bool, client: HUBC2000PPCommandClient
+) -> bool:
+    """Switch several relays on or off."""
+    command = "relay_on" if state else "relay_off"
+    return await _batch_command(command, relays, "RELAY_OK", client)
+
+
+async def arm_partitions(parts: Iterable[int], client: HUBC2000PPCommandClient) -> bool:
+    """ARM several partitions."""
+    return await _batch_command("arm", parts, "ARM_OK", client)
+
+
+async def disarm_partitions(
+    parts: Iterable[int], client: HUBC2000PPCommandClient
+) -> bool:
+    """DISARM several partitions."""
+    return await _batch_command("disarm", parts, "DISARM_OK", client)
+
+
+class HUBC2000PPCommandBatcher:
+    """Merge relay/partition commands issued at the same time into one command.
+
+    HA runs a service call for many entities concurrently, so commands queued
+    within BATCH_DELAY are sent with a single datagram.
+    """
+
+    def __init__(
+        self, client: HUBC2000PPCommandClient, delay: float = BATCH_DELAY
+    ) -> None:
+        """Init batcher data."""
+        self._client = client
+        self._delay = delay
+        self._queues: dict[tuple[str, bool], dict[int, asyncio.Future[bool]]] = {}
+
+    async def switch_relay(self, relay: int, state: bool) -> bool:
+        """Switch relay on or off."""
+        return await self._execute("relay", state, relay)
+
+    async def arm_partition(self, part: int) -> bool:
+        """ARM partition."""
+        return await self._execute("part", True, part)
+
+    async def disarm_partition(self, part: int) -> bool:
+        """DISARM partition."""
+        return await self._execute("part", False, part)
+
+    async def _execute(self, kind: str, state: bool, target: int) -> bool:
+        """Queue command and wait for the result of its batch."""
+        loop = asyncio.get_running_loop()
+        key = (kind, state)
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = {}
+            loop.call_later(self._delay, self._flush, key)
+
+        future = queue.get(target)
+        if future is None:
+            future = queue[target] = loop.create_future()
+
+        return await asyncio.shield(future)
+
+    def _flush(self, key: tuple[str, bool]) -> None:
+        """Send queued commands."""
+        queue = self._queues.pop(key)
+        asyncio.get_running_loop().create_task(self._send(key, queue))
+
+    async def _send(
+        self, key: tuple[str, bool], queue: dict[int, asyncio.Future[bool]]
+    ) -> None:
+        """Send batch and resolve waiting commands."""
+        kind, state = key
+        try:
+            if kind == "relay":
+                result = await switch_relays(queue, state, self._client)
+            elif state:
+                result = await arm_partitions(queue, self._client)
+            else:
+                result = await disarm_partitions(queue, self._client)
+        except Exception as err:  # pylint: disable=broad-except
+            for future in queue.values():
+                if not future.done():
+                    future.set_exception(err)
+            return
+
+        for future in queue.values():
+            if not future.done():
+                future.set_result(result)
+
+
+# record type of getZones, getParts and getRelays replies
+DEVICE_KINDS = ("zone", "part", "relay")
+
+
+def _parse_revision(result: str) -> tuple[str, int]:
+    """Parse "rev:epoch:revision" reply, raise ValueError if malformed."""
+    rev_info = result.split(":")
+    if len(rev_info) != 3 or rev_info[0] != "rev":
+        raise ValueError(f"Unexpected revision reply: {result}")
+    return rev_info[1], int(rev_info[2])
+
+
+def _parse_changes_page(
+    result: str, epoch: str, kinds: Collection[str]
+) -> tuple[int, bool, ParsedRecords]:
+    """Parse getChanges reply of the epoch.
+
+    Returns revision of the page, True if more pages follow, and the
+    records. Raises ValueError if malformed or a full fetch is needed.
+    """
+    header, _, records = result.partition(SEP_STRING)
+    header_info = header.split(":")
+    if (
+        len(header_info) not in (3, 4)
+        or header_info[0] != "changes"
+        or header_info[1] != epoch
+        or header_info[3:] not in ([], ["more"])
+    ):
+        raise ValueError(f"Unexpected changes header: {header}")
+
+    page = parse_records(records, kinds)
+    if page.errors:
+        raise ValueError(f"Malformed changes: {page.errors}")
+    return int(header_info[2]), len(header_info) == 4, page
+
+
+async def get_changes(
+    client: HUBC2000PPCommandClient,
+    devices: DeviceStore,
+    meta: ZoneMetaCache | None = None,
+) -> int | None:
+    """Merge devices changed since the store revision into the store.
+
+    If the script supports binary zone pages, changed zones are requested
+    as "state:id:state:adc" records without configuration and description.
+
+    Returns the number of devices whose state differed from the store, i.e.
+    changes that pushes didn't deliver. The script sends changes by pages
+    of the oldest ones, a page header with ":more" tells to request the next
+    page from the revision of the page. Changes left after CHANGES_MAX_PAGES
+    are picked up by the next call. Returns None if the store can't be
+    brought up to date this way (script restarted, malformed reply or
+    unknown device), a full get_devices() is needed then. Raises one of
+    COMMAND_ERRORS if the hub can't be reached.
+    """
+    if devices.revision is None or not client.correlated:
+        return None
+
+    epoch, revision = devices.revision
+    suffix = ""
+    kinds = DEVICE_KINDS
+    if meta is not None and meta.binary:
+        suffix = ":states"
+        kinds = ("state", "part", "relay")
+
+    changes = ParsedRecords()
+    for _ in range(CHANGES_MAX_PAGES):
+        try:
+            result = await client.request(
+                f"getChanges:{epoch}:{revision}{suffix}".encode()
+            )
+            revision, more, page = _parse_changes_page(result, epoch, kinds)
+        except ValueError as err:
+            _LOGGER.debug("Changes are not available: %s", err)
+            return None
+
+        changes.zones += page.zones
+        changes.states += page.states
+        changes.parts += page.parts
+        changes.relays += page.relays
+        if not more:
+            break
+
+    zones = [(devices.zone(zone.uid), zone) for zone in changes.zones]
+    zones += [(devices.zone_by_id(state.id), state) for state in changes.states]
+    parts = [(devices.part(part.id), part) for part in changes.parts]
+    relays = [(devices.relay(relay.id), relay) for relay in changes.relays]
+    if any(device is None for device, _ in zones + parts + relays):
+        return None
+
+    # a device changed again while paging comes once per page, apply in order
+    missed = 0
+    for device, change in zones + parts + relays:
+        missed += device.state != change.state
+        device.state = change.state
+    for device, change in zones:
+        device.adc = change.adc
+
+    devices.revision = (epoch, revision)
+    return missed
+
+
+async def _request_page(client: HUBC2000PPCommandClient, cmd: bytes) -> str:
+    """Request a page of zones, retried on timeout."""
+    for attempt in range(ZONES_PAGE_RETRIES + 1):
+        try:
+            return await client.request(cmd)
+        except asyncio.TimeoutError:
+            if attempt == ZONES_PAGE_RETRIES:
+                raise
+            _LOGGER.debug("Zones page %s timeout, retrying", cmd)
+
+
+async def _get_zones_page(
+    client: HUBC2000PPCommandClient, offset: int
+) -> tuple[int, str]:
+    """Request a page of zones, retried on timeout.
+
+    Returns total zone count and zone records of the page. Raises ValueError
+    on a reply without a proper "zones:offset:total" header.
+    """
+    result = await _request_page(
+        client, f"getZones:{offset}:{ZONES_PAGE_SIZE}".encode()
+    )
+    header, _, records = result.partition(SEP_STRING)
+    header_info = header.split(":")
+    if (
+        len(header_info) != 3
+        or header_info[0] != "zones"
+        or int(header_info[1]) != offset
+    ):
+        raise ValueError(f"Unexpected zones page header: {header}")
+
+    return int(header_info[2]), records
+
+
+async def _gather_pages(
+    fetch: Callable[[int], Awaitable[_PageT]], offsets: range
+) -> list[_PageT]:
+    """Fetch pages at offsets, at most ZONES_PAGE_WINDOW at once, in order."""
+    window = asyncio.Semaphore(ZONES_PAGE_WINDOW)
+
+    async def fetch_page(offset: int) -> _PageT:
+        async with window:
+            return await fetch(offset)
+
+    return await asyncio.gather(*(fetch_page(offset) for offset in offsets))
+
+
+async def _get_zones_paged(client: HUBC2000PPCommandClient) -> str:
+    """Get all zones page by page, return records joined as in getZones reply."""
+    total, records = await _get_zones_page(client, 0)
+    pages = [records]
+    pages += [
+        page_records
+        for _, page_records in await _gather_pages(
+            lambda offset: _get_zones_page(client, offset),
+            range(ZONES_PAGE_SIZE, total, ZONES_PAGE_SIZE),
+        )
+    ]
+    return SEP_STRING.join(page for page in pages if page)
+
+
+class ZoneMetaCache:
+    """Zone metadata of getZonesBin pages.
+
+    A getZonesBin page carries the hash of its zone metadata, the metadata
+    is requested by getZonesMeta pages only if the hash differs from the
+    cached one, i.e. on first sync or after a configuration change. binary
+    is None until the script answered the first getZonesBin, False if it
+    doesn't support it. Metadata and page hashes can be saved with as_dict()
+    and restored with from_dict(), changed is set when they need saving.
+    """
+
+    def __init__(self) -> None:
+        """Init empty cache."""
+        self.binary: bool | None = None
+        self.zones: dict[int, ZoneMeta] = {}
+        self.page_hashes: dict[int, str] = {}
+        self.changed = False
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return metadata and page hashes as JSON serializable dict."""
+        return {
+            "zones": [asdict(zone_meta) for zone_meta in self.zones.values()],
+            "page_hashes": {
+                str(offset): page_hash for offset, page_hash in self.page_hashes.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> ZoneMetaCache:
+        """Restore cache saved by as_dict(), empty cache if data is invalid."""
+        meta = cls()
+        if not data:
+            return meta
+        try:
+            for zone_data in data["zones"]:
+                zone_meta = ZoneMeta(**zone_data)
+                meta.zones[zone_meta.id] = zone_meta
+            meta.page_hashes = {
+                int(offset): str(page_hash)
+                for offset, page_hash in data["page_hashes"].items()
+            }
+        except (KeyError, TypeError, ValueError, AttributeError) as err:
+            _LOGGER.debug("Saved zone metadata dropped: %s", err)
+            return cls()
+        return meta
+
+    def retain(self, zone_ids: set[int]) -> None:
+        """Drop metadata of zones the script doesn't list anymore."""
+        for zone_id in self.zones.keys() - zone_ids:
+            del self.zones[zone_id]
+            self.changed = True
+
+
+async def _get_zones_bin_page(
+    client: HUBC2000PPCommandClient, meta: ZoneMetaCache, offset: int
+) -> tuple[int, list[Zone]] | None:
+    """Request a binary page of zones, retried on timeout.
+
+    Metadata of the page is requested by getZonesMeta pages if its hash
+    differs from the cached one. Returns total zone count and zones of the
+    page, None if the script doesn't support getZonesBin. Raises ValueError
+    on a malformed reply.
+    """
+    result = await _request_page(
+        client, f"getZonesBin:{offset}:{ZONES_BIN_PAGE_SIZE}".encode()
+    )
+    if result == "BAD_CMD":
+        return None
+
+    total, page_hash, states = parse_zones_bin_page(result, offset)
+    if meta.page_hashes.get(offset) != page_hash or any(
+        zone_id not in meta.zones for zone_id, _, _ in states
+    ):
+        # hash is kept only for pages decoded completely
+        meta.page_hashes.pop(offset, None)
+        await _get_zones_meta(client, meta, offset, len(states))
+
+    zones = zones_of_states(states, meta)
+    meta.page_hashes[offset] = page_hash
+    return total, zones
+
+
+async def _get_zones_meta(
+    client: HUBC2000PPCommandClient, meta: ZoneMetaCache, offset: int, count: int
+) -> None:
+    """Request metadata of count zones from offset into the cache."""
+    for page_offset in range(offset, offset + count, ZONES_PAGE_SIZE):
+        result = await _request_page(
+            client, f"getZonesMeta:{page_offset}:{ZONES_PAGE_SIZE}".encode()
+        )
+        for zone_meta in parse_zones_meta_page(result, page_offset):
+            meta.zones[zone_meta.id] = zone_meta
+            meta.changed = True
+
+
+def parse_zones_bin_page(result: str, offset: int) -> tuple[int, str, list[list]]:
+    """Parse getZonesBin reply.
+
+    Returns total zone count, metadata hash of the page and [zone id, state,
+    adc] lists of its zones. Raises ValueError on a malformed reply.
+    """
+    header, _, block = result.partition(SEP_STRING)
+    header_info = header.split(":")
+    if (
+        len(header_info) != 4
+        or header_info[0] != "zonesbin"
+        or int(header_info[1]) != offset
+    ):
+        raise ValueError(f"Unexpected zones page header: {header}")
+    return int(header_info[2]), header_info[3], decode_zone_states(block)
+
+
+def parse_zones_meta_page(result: str, offset: int) -> list[ZoneMeta]:
+    """Parse getZonesMeta reply, raises ValueError if malformed."""
+    header, _, records = result.partition(SEP_STRING)
+    header_info = header.split(":")
+    if (
+        len(header_info) != 3
+        or header_info[0] != "zonesmeta"
+        or int(header_info[1]) != offset
+    ):
+        raise ValueError(f"Unexpected zones page header: {header}")
+
+    parsed = parse_records(records, ("meta",))
+    if parsed.errors:
+        raise ValueError(f"Malformed zone metadata: {parsed.errors}")
+    return parsed.metas
+
+
+def zones_of_states(states: list[list], meta: ZoneMetaCache) -> list[Zone]:
+    """Make zones of decoded states and cached metadata.
+
+    Raises ValueError for a zone without metadata.
+    """
+    zones = []
+    for zone_id, state, adc in states:
+        zone_meta = meta.zones.get(zone_id)
+        if zone_meta is None:
+            raise ValueError(f"No metadata of zone {zone_id}")
+        zones.append(
+            Zone(
+                zone_id,
+                zone_meta.sh,
+                zone_meta.part,
+                zone_meta.stype,
+                state,
+                adc,
+                zone_meta.type,
+                zone_meta.dev,
+                zone_meta.desc,
+                zone_meta.uid,
+            )
+        )
+    return zones
+
+
+async def _get_zones_binary(
+    client: HUBC2000PPCommandClient, meta: ZoneMetaCache
+) -> list[Zone] | None:
+    """Get all zones by binary pages, None if the script doesn't support them."""
+    first = await _get_zones_bin_page(client, meta, 0)
+    if meta.binary is None:
+        meta.binary = first is not None
+        _LOGGER.debug(
+            "Binary zone pages %s", "supported" if meta.binary else "not supported"
+        )
+    if first is None:
+        return None
+
+    total, zones = first
+    for page in await _gather_pages(
+        lambda offset: _get_zones_bin_page(client, meta, offset),
+        range(ZONES_BIN_PAGE_SIZE, total, ZONES_BIN_PAGE_SIZE),
+    ):
+        if page is None:
+            raise ValueError("Binary zone page refused")
+        zones += page[1]
+    meta.retain({zone.id for zone in zones})
+    return zones
+
+
+async def _get_zones(
+    client: HUBC2000PPCommandClient, meta: ZoneMetaCache | None
+) -> ParsedRecords:
+    """Get zones by binary pages if the script supports them, text otherwise."""
+    if meta is not None and meta.binary is not False:
+        zones = await _get_zones_binary(client, meta)
+        if zones is not None:
+            return ParsedRecords(zones=zones)
+    return parse_records(await _get_zones_paged(client), ("zone",))
+
+
+async def get_devices(
+    client: HUBC2000PPCommandClient, meta: ZoneMetaCache | None = None
+) -> DeviceStore:
+    """Get devices from HUB-C2000PP service.
+
+    If the script supports request ids (zone paging came in the same script
+    version) all queries are sent at once, replies are matched by id and
+    zones are fetched by pages that fit a datagram. With a metadata cache
+    zones are requested in binary format if the script supports it.
+    Otherwise the whole lists are requested one by one.
+    """
+    devices = DeviceStore()
+
+    try:
+        await client.connect()
+        if client.correlated:
+            # revision is requested first, changes made while the lists are
+            # being sent will be picked up by the next get_changes()
+            revision, zones, *results = await asyncio.gather(
+                client.request(b"getRev"),
+                _get_zones(client, meta),
+                client.request(b"getParts"),
+                client.request(b"getRelays"),
+            )
+            devices.add_records(zones)
+            kinds = DEVICE_KINDS[1:]
+        else:
+            revision = None
+            results = [
+                await client.request(cmd)
+                for cmd in (b"getZones", b"getParts", b"getRelays")
+            ]
+            kinds = DEVICE_KINDS
+        if revision is not None:
+            devices.revision = _parse_revision(revision)
     except asyncio.TimeoutError:
-        devices["error"] = "Connection timeout"
+        devices.error = "Connection timeout"
+        return devices
+    except COMMAND_ERRORS as err:
+        devices.error = f"Connection error: {err}"
         return devices
+    except ValueError as err:
+        _LOGGER.debug("%s", err)
+        devices.error = "Unexpected server reply"
+        return devices
+
+    for result, kind in zip(results, kinds):
+        if result == "BAD_CMD":
+            devices.error = "Server returned BAD_CMD"
+            return devices
+
+        devices.add_records(parse_records(result, (kind,)))
+
+    for err in devices.record_errors:
+        _LOGGER.debug("Malformed record %d (%s): %s", err.index, err.reason, err.record)
+
+    return devices
 
 
 def create_udp_socket(host, port, blocking=True) -> socket.socket | None:
@@ -228,36 +1061,78 @@ def create_udp_socket(host, port, blocking=True) -> socket.socket | None:
 class HUBC2000PPUdpReceiver:
     """Async UDP communication class for HUBC2000PP."""
 
-    def __init__(self, port=22000) -> None:
-        """Init receiver data."""
+    def __init__(self, port=22000, dedup_window=DEDUP_WINDOW) -> None:
+        """Init receiver data.
+
+        All pending datagrams are read at once and each hub gets one batch
+        callback per loop tick instead of one call per datagram.
+        """
         self._protocol = None
         self._port = port
         self._registered_callbacks: dict[Any, Any] = {}
-
-    def _create_udp_listener(self):
-        """Create the UDP multicast socket and protocol."""
-        udp_socket = create_udp_socket(LISTEN_ADDRESS, self._port, blocking=False)
-        loop = asyncio.get_event_loop()
-        return loop.create_datagram_endpoint(
-            lambda: self.UdpListenerProtocol(loop, udp_socket, self),
-            sock=udp_socket,
-        )
+        self._batch_callbacks: dict[Any, Any] = {}
+        self._dedup_window = dedup_window
+        self._last_datagrams: dict[str, tuple[bytes, float]] = {}
+        self._dedup_passed = 0
+        self._dedup_dropped = 0
 
     @property
     def registered_callbacks(self):
         """Return the callbacks."""
         return self._registered_callbacks
 
-    def register_hub(self, ip, callback):
-        """Register a HUB to this udp listener."""
+    @property
+    def dedup_stats(self) -> dict[str, int]:
+        """Return counters of passed and dropped duplicate datagrams."""
+        return {"passed": self._dedup_passed, "dropped": self._dedup_dropped}
+
+    def is_duplicate(self, ip: str, data: bytes) -> bool:
+        """Check if datagram repeats the previous one from the same hub.
+
+        Only the last datagram of each hub is remembered, so a real state flip
+        back to a previous value (A, B, A) is never dropped.
+        """
+        now = time.monotonic()
+        last = self._last_datagrams.get(ip)
+        if last is not None and last[0] == data and now - last[1] < self._dedup_window:
+            self._dedup_dropped += 1
+            return True
+
+        self._last_datagrams[ip] = (data, now)
+        self._dedup_passed += 1
+        return False
+
+    def register_hub(self, ip, callback, batch_callback=None):
+        """Register a HUB to this udp listener.
+
+        batch_callback gets a list of messages read at once, if not set
+        callback is called for each message of the batch.
+        """
         if ip in self._registered_callbacks:
             _LOGGER.error("A callback for ip '%s' already registered, overwriting!", ip)
         self._registered_callbacks[ip] = callback
+        if batch_callback is not None:
+            self._batch_callbacks[ip] = batch_callback
+        else:
+            self._batch_callbacks.pop(ip, None)
+
+    def dispatch_batch(self, ip, messages: list[str]) -> None:
+        """Pass messages received in one drain to hub callbacks."""
+        batch_callback = self._batch_callbacks.get(ip)
+        if batch_callback is not None:
+            batch_callback(messages)
+            return
+
+        callback = self._registered_callbacks[ip]
+        for message in messages:
+            callback(message)
 
     def unregister_hub(self, ip):
         """Unregister a HUB from this udp listener."""
         if ip in self._registered_callbacks:
             self._registered_callbacks.pop(ip)
+        self._batch_callbacks.pop(ip, None)
+        self._last_datagrams.pop(ip, None)
 
     async def start_listen(self):
         """Start listening."""
@@ -265,7 +1140,12 @@ class HUBC2000PPUdpReceiver:
             _LOGGER.error("Udp listener already started, not starting another one")
             return
 
-        _, self._protocol = await self._create_udp_listener()
+        udp_socket = create_udp_socket(LISTEN_ADDRESS, self._port, blocking=False)
+        # room for bursts from several hubs between loop ticks
+        udp_socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, DRAIN_RCVBUF)
+        self._protocol = self.UdpDrainListener(
+            asyncio.get_running_loop(), udp_socket, self
+        )
 
     def stop_listen(self):
         """Stop listening."""
@@ -275,57 +1155,53 @@ class HUBC2000PPUdpReceiver:
         self._protocol.close()
         self._protocol = None
 
-    class UdpListenerProtocol:
-        """Handle received udp messages."""
+    class UdpDrainListener:
+        """Read all pending datagrams when the socket becomes readable."""
 
         def __init__(self, loop, udp_socket, parent) -> None:
-            """Initialize the class."""
-            self.transport = None
+            """Initialize the class and start reading."""
             self._loop = loop
             self._sock = udp_socket
             self._parent = parent
-            self._connected = False
-
-        def connection_made(self, transport):
-            """Set the transport."""
-            self.transport = transport
-            self._connected = True
+            self._loop.add_reader(self._sock.fileno(), self._read_ready)
             _LOGGER.info("HUBC2000PP udp listener started")
 
-        def connection_lost(self, exc):
-            """Handle connection lost."""
-            if self._connected:
-                _LOGGER.error("Connection lost in HUBC2000PP udp listener: %s", exc)
-
-        def datagram_received(self, data, addr):
-            """Handle received messages."""
-            try:
-                (ip_add, _) = addr
-                message = data.decode("utf-8")
+        def _read_ready(self) -> None:
+            """Drain socket, dedupe and decode, then dispatch batches per hub."""
+            batches: dict[str, list[str]] = {}
+            for _ in range(DRAIN_MAX_DATAGRAMS):
+                try:
+                    data, (ip_add, _) = self._sock.recvfrom(MAX_DATAGRAM_SIZE)
+                except (BlockingIOError, InterruptedError):
+                    break
+                except OSError as exc:
+                    _LOGGER.error("UDP error in HUBC2000PP udp listener: %s", exc)
+                    break
 
                 if ip_add not in self._parent.registered_callbacks:
                     _LOGGER.info("Unknown hub ip %s", ip_add)
-                    return
+                    continue
 
-                callback = self._parent.registered_callbacks[ip_add]
-                callback(message)
+                if self._parent.is_duplicate(ip_add, data):
+                    continue
 
-            except Exception:  # pylint: disable=broad-except
-                _LOGGER.exception("Cannot process hub udp message: '%s'", data)
+                try:
+                    message = data.decode("utf-8")
+                except UnicodeDecodeError:
+                    _LOGGER.warning("Cannot decode hub udp message: '%s'", data)
+                    continue
+                batches.setdefault(ip_add, []).append(message)
 
-        def error_received(self, exc):
-            """Log UDP errors."""
-            _LOGGER.error("UDP error received in HUBC2000PP udp listener: %s", exc)
+            for ip_add, messages in batches.items():
+                try:
+                    self._parent.dispatch_batch(ip_add, messages)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception("Cannot process hub udp messages: %s", messages)
 
         def close(self):
-            """Stop the server."""
+            """Stop reading and close the socket."""
             _LOGGER.debug("HUBC2000PP udp listener shutting down")
-            self._connected = False
-            if self.transport:
-                self.transport.close()
-
             with suppress(NotImplementedError):
-                self._loop.remove_writer(self._sock.fileno())
                 self._loop.remove_reader(self._sock.fileno())
 
             self._sock.close()
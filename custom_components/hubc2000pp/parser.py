@@ -0,0 +1,239 @@
+"""Parser of HUB-C2000PP script device records."""
+
+from __future__ import annotations
+
+import base64
+from collections.abc import Callable, Collection
+from dataclasses import dataclass, field
+import struct
+from typing import NamedTuple
+
+SEP_STRING = "__DLM__"
+
+
+@dataclass(slots=True)
+class Zone:
+    """Zone (sh) of the hub, state is an event code, None if unknown ("-")."""
+
+    id: int
+    sh: str
+    part: str
+    stype: str
+    state: int | None
+    adc: float | None
+    type: str
+    dev: str
+    desc: str
+    uid: str
+
+
+@dataclass(slots=True)
+class Partition:
+    """Partition of the hub, state is an event code."""
+
+    id: int
+    state: int
+    desc: str
+    uid: str
+
+
+@dataclass(slots=True)
+class Relay:
+    """Relay of the hub, state is True if switched on."""
+
+    id: int
+    state: bool
+    desc: str
+
+
+@dataclass(slots=True)
+class ZoneMeta:
+    """Zone configuration and description, everything but state and ADC."""
+
+    id: int
+    sh: str
+    part: str
+    stype: str
+    type: str
+    dev: str
+    desc: str
+    uid: str
+
+
+@dataclass(slots=True)
+class ZoneState:
+    """State and ADC value of a zone, the record of steady-state polls."""
+
+    id: int
+    state: int | None
+    adc: float | None
+
+
+def parse_code(value: str) -> int | None:
+    """Parse state code, "-" means unknown. Raises ValueError if malformed."""
+    if value in ("", "-"):
+        return None
+    return int(value)
+
+
+def parse_adc(value: str) -> float | None:
+    """Parse ADC or counter value, "-" means no value yet."""
+    if value in ("", "-"):
+        return None
+    return round(float(value), 2)
+
+
+def _zone(fields: list[str]) -> Zone:
+    """Make zone of "id:sh:part:stype:state:adc:type:dev:desc" fields."""
+    zone_id, sh, part, stype, state, adc, sensor_type, dev, desc = fields
+    zone_id = int(zone_id)
+    return Zone(
+        zone_id,
+        sh,
+        part,
+        stype,
+        parse_code(state),
+        parse_adc(adc),
+        sensor_type,
+        dev,
+        desc,
+        f"{zone_id}.{sh}.{part}.{stype}",
+    )
+
+
+def _part(fields: list[str]) -> Partition:
+    """Make partition of "id:state:desc" fields."""
+    part_id = int(fields[0])
+    return Partition(part_id, int(fields[1]), fields[2], f"partition_{part_id}")
+
+
+def _relay(fields: list[str]) -> Relay:
+    """Make relay of "id:state:desc" fields."""
+    relay_id, state, desc = fields
+    return Relay(int(relay_id), state == "true", desc)
+
+
+def _meta(fields: list[str]) -> ZoneMeta:
+    """Make zone metadata of "id:sh:part:stype:type:dev:desc" fields."""
+    zone_id, sh, part, stype, sensor_type, dev, desc = fields
+    zone_id = int(zone_id)
+    return ZoneMeta(
+        zone_id,
+        sh,
+        part,
+        stype,
+        sensor_type,
+        dev,
+        desc,
+        f"{zone_id}.{sh}.{part}.{stype}",
+    )
+
+
+def _state(fields: list[str]) -> ZoneState:
+    """Make zone state of "id:state:adc" fields."""
+    zone_id, state, adc = fields
+    return ZoneState(int(zone_id), parse_code(state), parse_adc(adc))
+
+
+# record type -> fields after the type, the description is the last field
+RECORD_SCHEMAS: dict[str, tuple[int, Callable[[list[str]], object]]] = {
+    "zone": (9, _zone),
+    "part": (3, _part),
+    "relay": (3, _relay),
+    "meta": (7, _meta),
+    "state": (3, _state),
+}
+
+
+class RecordError(NamedTuple):
+    """Record of a reply that couldn't be parsed."""
+
+    index: int
+    record: str
+    reason: str
+
+
+@dataclass(slots=True)
+class ParsedRecords:
+    """Devices and errors of parsed records."""
+
+    zones: list[Zone] = field(default_factory=list)
+    parts: list[Partition] = field(default_factory=list)
+    relays: list[Relay] = field(default_factory=list)
+    metas: list[ZoneMeta] = field(default_factory=list)
+    states: list[ZoneState] = field(default_factory=list)
+    errors: list[RecordError] = field(default_factory=list)
+
+
+def parse_records(
+    reply: str, kinds: Collection[str] = ("zone", "part", "relay")
+) -> ParsedRecords:
+    """Parse records of a getZones/getParts/getRelays/getChanges reply.
+
+    Every record type has a fixed number of fields and the description is
+    the last one, so a record is split once and descriptions may contain
+    ":". Records of types not in kinds or not matching their schema are
+    skipped and reported in errors, the rest of the reply is still parsed.
+    """
+    parsed = ParsedRecords()
+    if not reply:
+        return parsed
+
+    targets = {
+        "zone": parsed.zones,
+        "part": parsed.parts,
+        "relay": parsed.relays,
+        "meta": parsed.metas,
+        "state": parsed.states,
+    }
+    for index, record in enumerate(reply.split(SEP_STRING)):
+        kind, _, rest = record.partition(":")
+        if kind not in kinds or kind not in RECORD_SCHEMAS:
+            parsed.errors.append(
+                RecordError(index, record, f"unexpected record type {kind!r}")
+            )
+            continue
+
+        count, make = RECORD_SCHEMAS[kind]
+        fields = rest.split(":", count - 1)
+        if len(fields) != count:
+            parsed.errors.append(
+                RecordError(
+                    index, record, f"{kind} has {len(fields)} fields, {count} expected"
+                )
+            )
+            continue
+
+        try:
+            targets[kind].append(make(fields))
+        except ValueError as err:
+            parsed.errors.append(RecordError(index, record, str(err)))
+
+    return parsed
+
+
+def decode_zone_states(block: str) -> list[list]:
+    """Decode base64 zone states of a getZonesBin page.
+
+    Little endian layout: u16 count, count * (u16 zone id, i16 state code or
+    -1 if unknown), u16 ADC count, ADC count * (u16 index of the zone, 48 bit
+    signed ADC value in hundredths as u16 low and i32 high part). Returns
+    [zone id, state, adc] lists, raises ValueError if malformed.
+    """
+    try:
+        data = base64.b64decode(block, validate=True)
+        (count,) = struct.unpack_from("<H", data)
+        end = 2 + 4 * count
+        states = [
+            [zone_id, None if state < 0 else state, None]
+            for zone_id, state in struct.iter_unpack("<Hh", data[2:end])
+        ]
+        (adc_count,) = struct.unpack_from("<H", data, end)
+        adc_end = end + 2 + 8 * adc_count
+        if len(states) != count or len(data) != adc_end:
+            raise ValueError(f"Zone states size mismatch: {len(data)}")
+        for index, low, high in struct.iter_unpack("<HHi", data[end + 2 : adc_end]):
+            states[index][2] = (high * 65536 + low) / 100
+    except (struct.error, IndexError) as err:
+        raise ValueError(f"Malformed zone states: {err}") from err
+    return states
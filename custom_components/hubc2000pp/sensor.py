@@ -1,5 +1,7 @@
 """Support for HUB-C2000PP common sensor."""
+from collections.abc import Mapping
 import logging
+import time
 from typing import Any
 
 from homeassistant.components.sensor import (
@@ -16,13 +18,28 @@ from homeassistant.const import (
     UnitOfSoundPressure,
     UnitOfTemperature,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.entity import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import HUBC2000PPDataUpdateCoordinator
-from .const import DEVICE_EVENTS_DICT, DEVICE_STATUSES_DICT, DOMAIN
+from .const import (
+    ADC_GROUPS,
+    CONF_ADC_DEADBAND,
+    CONF_ADC_HEARTBEAT,
+    CONF_ADC_MIN_INTERVAL,
+    DEFAULT_ADC_DEADBAND,
+    DEFAULT_ADC_HEARTBEAT,
+    DEFAULT_ADC_MIN_INTERVAL,
+    DEVICE_CODE_COUNT,
+    DEVICE_STATUS_LABELS,
+    DEVICE_STATUS_OPTIONS,
+    DEVICE_STATUSES_DICT,
+    DOMAIN,
+)
+from .hubc2000pp import AdcFilter, Zone, parse_deadband
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -96,138 +113,227 @@ async def async_setup_entry(
 ) -> None:
     """Set up Bolid sensor."""
     coordinator: HUBC2000PPDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    devices = coordinator.data["zones"]
+    devices = coordinator.data.zones
+    adc_filters = _get_adc_filters(entry.options)
     entities = []
     for device in devices:
-        if device["type"] in ADC_SENSORS:
-            entities.append(Device(device, coordinator, True))
+        if device.type in ADC_SENSORS:
+            adc_filter = adc_filters.get(device.type, AdcFilter())
+            entities.append(Device(device, coordinator, True, adc_filter))
         entities.append(Device(device, coordinator, False))
 
     async_add_entities(entities)
 
 
+def _get_adc_filters(options: Mapping[str, Any]) -> dict[str, AdcFilter]:
+    """Build ADC filters of sensor types from entry options."""
+    heartbeat = options.get(CONF_ADC_HEARTBEAT, DEFAULT_ADC_HEARTBEAT)
+    filters = {}
+    for group, types in ADC_GROUPS.items():
+        deadband, percent = parse_deadband(
+            options.get(CONF_ADC_DEADBAND.format(group), DEFAULT_ADC_DEADBAND[group])
+        )
+        adc_filter = AdcFilter(
+            deadband,
+            percent,
+            options.get(
+                CONF_ADC_MIN_INTERVAL.format(group), DEFAULT_ADC_MIN_INTERVAL[group]
+            ),
+            heartbeat,
+        )
+        filters.update(dict.fromkeys(types, adc_filter))
+    return filters
+
+
 class Device(CoordinatorEntity[HUBC2000PPDataUpdateCoordinator], SensorEntity):
     """Representation of an Bolid sensor from HUB-C2000PP data."""
 
     def __init__(
         self,
-        device: dict[str, Any],
+        device: Zone,
         coordinator: HUBC2000PPDataUpdateCoordinator,
         adc: bool,
+        adc_filter: AdcFilter | None = None,
     ) -> None:
         """Initialize the Bolid sensor."""
         super().__init__(coordinator)
 
+        self._adc_filter = adc_filter or AdcFilter()
+        # monotonic time of the last ADC write, None if not written yet
+        self._adc_written: float | None = None
+        self._adc_unsub: CALLBACK_TYPE | None = None
+        self._heartbeat_unsub: CALLBACK_TYPE | None = None
+
         device_name = self.name
-        device_uid = device["uid"]
+        device_uid = device.uid
+        self._uid = device.uid
 
-        if device["type"] == "carbonMonoxideSensor":
+        if device.type == "carbonMonoxideSensor":
             device_name = "с2000-вти"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
 
-        if device["type"] == "soundSensor":
+        if device.type == "soundSensor":
             device_name = "с2000-пик"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
 
-        if device["type"] == "smokeSensor":
+        if device.type == "smokeSensor":
             device_name = "ДИП-34А"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
 
-        if device["type"] == "doorSensor":
+        if device.type == "doorSensor":
             device_name = "с2000-смк"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
 
-        if device["type"] == "windowSensor":
+        if device.type == "windowSensor":
             device_name = "с2000-смк"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
 
-        if device["type"] == "motionSensor":
+        if device.type == "motionSensor":
             device_name = "с2000-ИК"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
 
-        if device["type"].startswith("rip"):
+        if device.type.startswith("rip"):
             device_name = "РИП12-RS"
-            device_uid = device["dev"]
+            device_uid = device.dev
 
-        if device["type"].startswith("counter"):
+        if device.type.startswith("counter"):
             device_name = "С2000-АСРх"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
 
-        if device["type"] == "genericAdcSensor":
+        if device.type == "genericAdcSensor":
             device_name = "АЦП"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
         
-        if device["type"].startswith("temperature") or device["type"].startswith(
-            "humidity"
-        ):
+        if device.type.startswith("temperature") or device.type.startswith("humidity"):
             device_name = "C2000-BT"
-            device_uid = f'{device["dev"]}.{device["sh"]}'
+            device_uid = f"{device.dev}.{device.sh}"
 
         self._attr_device_info = DeviceInfo(
             identifiers={
                 (DOMAIN, device_uid),
             },
             manufacturer="Bolid",
-            model=device["type"],
+            model=device.type,
             name=device_name,
         )
 
         if adc:
             # ADC entinity with predefined types
-            self._attr_name = device["desc"]
-            self._attr_unique_id = device["uid"]
-            self._type = device["type"]
+            self._attr_name = device.desc
+            self._attr_unique_id = device.uid
+            self._type = device.type
 
-            self._attr_device_class = DEVICE_CLASS_MAP[device["type"]]
-            self._attr_state_class = STATE_CLASS_MAP[device["type"]]
-            self._attr_native_unit_of_measurement = UNIT_MAP[device["type"]]
+            self._attr_device_class = DEVICE_CLASS_MAP[device.type]
+            self._attr_state_class = STATE_CLASS_MAP[device.type]
+            self._attr_native_unit_of_measurement = UNIT_MAP[device.type]
             self._attr_native_value = 0
             self._attr_suggested_display_precision = 2
         else:
             # "status" entinity
-            self._attr_name = f'Статус. {device["desc"]}'
-            self._attr_unique_id = f'{device["uid"]}_state'
-            self._type = device["type"]
+            self._attr_name = f"Статус. {device.desc}"
+            self._attr_unique_id = f"{device.uid}_state"
+            self._type = device.type
 
             self._attr_icon = "mdi:information-variant"
             self._attr_device_class = SensorDeviceClass.ENUM
-            self._attr_options = list(DEVICE_STATUSES_DICT.values()) + list(
-                DEVICE_EVENTS_DICT.values()
-            )
+            self._attr_options = DEVICE_STATUS_OPTIONS
 
     def _get_status_by_code(self, code: int) -> str:
         """Get status or event description for code."""
-        result = DEVICE_STATUSES_DICT.get(code, None)
-        if not result:
-            result = DEVICE_EVENTS_DICT.get(code, DEVICE_STATUSES_DICT[0])
-        return result
+        if 0 <= code < DEVICE_CODE_COUNT:
+            return DEVICE_STATUS_LABELS[code]
+        return DEVICE_STATUSES_DICT[0]
 
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        device = next(
-            (
-                device
-                for device in self.coordinator.data["zones"]
-                if self.unique_id in (device["uid"], f"{device['uid']}_state")
-            ),
-            None,
-        )
+        device = self.coordinator.data.zone(self._uid)
         if self._attr_device_class != SensorDeviceClass.ENUM:
-            if device is not None and "adc" in device and device["adc"] != "-":
-                if self._attr_native_value != device["adc"]:
-                    self._attr_native_value = device["adc"]
-                    super()._handle_coordinator_update()
+            if device is not None and device.adc is not None:
+                self._update_adc(device.adc)
         else:
-            if device is not None and "state" in device and device["state"] != "-":
-                value = self._get_status_by_code(int(device["state"]))
-                code = int(device["state"])
+            if device is not None and device.state is not None:
+                code = device.state
+                value = self._get_status_by_code(code)
                 if self._attr_native_value != value:
                     self._attr_native_value = value
                     self._attr_extra_state_attributes = {"code": code}
                     super()._handle_coordinator_update()
 
+    def _update_adc(self, value: float) -> None:
+        """Write ADC value unless filtered by deadband or rate limit."""
+        since_write = None
+        if self._adc_written is not None:
+            since_write = time.monotonic() - self._adc_written
+        delay = self._adc_filter.delay(self._attr_native_value, value, since_write)
+        if delay is None:
+            return
+        if delay > 0:
+            # write the latest value when min interval is over
+            if self._adc_unsub is None:
+                self._adc_unsub = async_call_later(
+                    self.hass, delay, self._async_adc_delay_over
+                )
+            return
+
+        self._write_adc(value)
+
+    def _write_adc(self, value: float) -> None:
+        """Write ADC value and schedule the next heartbeat write.
+
+        An unchanged value is written only by heartbeat, it is forced so that
+        the state machine and the recorder get it.
+        """
+        self._attr_force_update = value == self._attr_native_value
+        self._attr_native_value = value
+        self._adc_written = time.monotonic()
+        super()._handle_coordinator_update()
+        self._attr_force_update = False
+
+        if self._adc_filter.heartbeat:
+            self._async_cancel_heartbeat()
+            self._heartbeat_unsub = async_call_later(
+                self.hass, self._adc_filter.heartbeat, self._async_heartbeat
+            )
+
+    @callback
+    def _async_adc_delay_over(self, _now: Any) -> None:
+        """Write ADC value delayed by rate limit."""
+        self._adc_unsub = None
+        self._handle_coordinator_update()
+
+    @callback
+    def _async_heartbeat(self, _now: Any) -> None:
+        """Write the latest ADC value if nothing was written for a heartbeat."""
+        self._heartbeat_unsub = None
+        device = self.coordinator.data.zone(self._uid)
+        if device is None or device.adc is None:
+            self._write_adc(self._attr_native_value)
+        else:
+            self._write_adc(device.adc)
+
+    @callback
+    def _async_cancel_heartbeat(self) -> None:
+        """Cancel heartbeat write."""
+        if self._heartbeat_unsub is not None:
+            self._heartbeat_unsub()
+            self._heartbeat_unsub = None
+
+    @callback
+    def _async_cancel_adc_delay(self) -> None:
+        """Cancel delayed ADC write."""
+        if self._adc_unsub is not None:
+            self._adc_unsub()
+            self._adc_unsub = None
+
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
+        self.async_on_remove(self._async_cancel_adc_delay)
+        self.async_on_remove(self._async_cancel_heartbeat)
+        self.async_on_remove(
+            self.coordinator.async_subscribe_device(
+                "zones", self._uid, self._handle_coordinator_update
+            )
+        )
         self._handle_coordinator_update()
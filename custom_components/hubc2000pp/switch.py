@@ -11,7 +11,7 @@ from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from . import HUBC2000PPDataUpdateCoordinator
 from .const import DOMAIN
-from .hubc2000pp import RelayFailed, switch_relay
+from .hubc2000pp import Relay, RelayFailed
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -25,7 +25,7 @@ async def async_setup_entry(
 ) -> None:
     """Set up Bolid sensor."""
     coordinator: HUBC2000PPDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    devices = coordinator.data["relays"]
+    devices = coordinator.data.relays
     entities = []
     for device in devices:
         entities.append(SwitchDevice(device, coordinator))
@@ -38,13 +38,13 @@ class SwitchDevice(CoordinatorEntity[HUBC2000PPDataUpdateCoordinator], SwitchEnt
 
     def __init__(
         self,
-        device: dict[str, Any],
+        device: Relay,
         coordinator: HUBC2000PPDataUpdateCoordinator,
     ) -> None:
         """Initialize the Bolid sensor."""
         super().__init__(coordinator)
 
-        device_uid = f'relay_{device["id"]}'
+        device_uid = f"relay_{device.id}"
         device_name = "Реле"
         device_class = SwitchDeviceClass.SWITCH
 
@@ -57,8 +57,8 @@ class SwitchDevice(CoordinatorEntity[HUBC2000PPDataUpdateCoordinator], SwitchEnt
             name=device_name,
         )
 
-        self.relay_id = int(device["id"])
-        self._attr_name = device["desc"]
+        self.relay_id = int(device.id)
+        self._attr_name = device.desc
         self._attr_unique_id = device_uid
         self._type = "Relay"
         self._attr_device_class = device_class
@@ -66,18 +66,10 @@ class SwitchDevice(CoordinatorEntity[HUBC2000PPDataUpdateCoordinator], SwitchEnt
     @callback
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        device: dict[str, Any] | None = next(
-            (
-                device
-                for device in self.coordinator.data["relays"]
-                if f'relay_{device["id"]}' == self.unique_id
-            ),
-            None,
-        )
+        device: Relay | None = self.coordinator.data.relay(self.relay_id)
 
         if device:
-            state = device["stat"]
-            is_on = state == "true"
+            is_on = device.state
 
             # Call update entry only if data was changed
             if self._attr_is_on != is_on:
@@ -87,30 +79,23 @@ class SwitchDevice(CoordinatorEntity[HUBC2000PPDataUpdateCoordinator], SwitchEnt
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         await super().async_added_to_hass()
+        self.async_on_remove(
+            self.coordinator.async_subscribe_device(
+                "relays", self.relay_id, self._handle_coordinator_update
+            )
+        )
         self._handle_coordinator_update()
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the switch on."""
-        coordinator = self.coordinator
-        result = await switch_relay(
-            self.relay_id,
-            True,
-            coordinator.host,
-            coordinator.port,
-        )
+        result = await self.coordinator.batcher.switch_relay(self.relay_id, True)
         if not result:
-            _LOGGER.error("Can't DISARM partition: %d, self.partition_id")
+            _LOGGER.error("Can't switch relay: %d", self.relay_id)
             raise RelayFailed()
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the switch off."""
-        coordinator = self.coordinator
-        result = await switch_relay(
-            self.relay_id,
-            False,
-            coordinator.host,
-            coordinator.port,
-        )
+        result = await self.coordinator.batcher.switch_relay(self.relay_id, False)
         if not result:
-            _LOGGER.error("Can't DISARM partition: %d, self.partition_id")
+            _LOGGER.error("Can't switch relay: %d", self.relay_id)
             raise RelayFailed()
@@ -9,6 +9,37 @@ const DLM = "__DLM__";
 
 var adc_list = {};
 
+// Push уведомления об изменении ADC и счетчиков ("adc:uid:значение").
+// По умолчанию выключены: значения отдаются только по запросу. Уведомление
+// отправляется, если значение изменилось больше чем на ADC_PUSH_DEADBAND и
+// прошло не меньше ADC_PUSH_INTERVAL мс с прошлого уведомления этой зоны.
+// Пропущенные значения интеграция получит при очередном опросе
+var adc_push = false;
+const ADC_PUSH_DEADBAND = 0.1;
+const ADC_PUSH_INTERVAL = 10000;
+var adc_pushed = {};
+
+// Ревизии изменений для запроса getChanges. Эпоха меняется при перезапуске
+// скрипта, revision увеличивается при каждом изменении зоны, раздела или реле
+const epoch = Date.now();
+var revision = 0;
+var zone_rev = {};
+var part_rev = {};
+var relay_rev = {};
+// Записей в одном ответе getChanges не больше, остальные изменения
+// интеграция запрашивает следующим запросом (шумные ADC не вызывают полный
+// запрос всех данных). 10 записей зон с описаниями умещаются в одну
+// датаграмму без фрагментации
+const CHANGES_LIMIT = 10;
+
+// Двоичный формат страниц зон (getZonesBin). Состояния и значения ADC
+// передаются упакованными записями в base64 вместе с хешем описаний страницы.
+// Описания зон ("meta:...") интеграция запрашивает отдельными страницами
+// (getZonesMeta), только если хеш отличается от сохраненного, т.е. при
+// первой синхронизации или после изменения конфигурации
+const ZONE_STATE_UNKNOWN = -1;
+const B64 = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/";
+
 // Заполняется вручную по реальным данным. Цифра - номер зоны
 // Типы счетчиков - https://developers.home-assistant.io/docs/core/entity/sensor/#available-state-classes
 var sensor_types = {
@@ -36,68 +67,127 @@ var sensor_types = {
 	22: "genericAdcSensor",
 }
 
+// Порядковый номер push уведомления. По пропускам в номерах интеграция
+// определяет потерю датаграмм и сразу запрашивает изменения
+var push_seq = 0;
+
+function push(data) {
+	// Отправляем push уведомление дважды на случай потери датаграммы
+	push_seq++;
+	udp.writeDatagram(data + ":" + push_seq, host, port + 1);
+	udp.writeDatagram(data + ":" + push_seq, host, port + 1);
+}
+
+function zoneUid(sh_id) {
+	// Уникальный идентификатор зоны "номер.шлейф.раздел.тип"
+	return "" + sh_id + "." + hub.getShNum(sh_id) + "." + hub.getShPart(sh_id) + "." + hub.getShType(sh_id);
+}
+
+function pushAdc(sh_id, value) {
+	// Отправляем push уведомление ADC с учетом зоны нечувствительности и интервала
+	if (!adc_push) {
+		return;
+	}
+	let now = Date.now();
+	let last = adc_pushed[sh_id];
+	if (last !== undefined) {
+		if (Math.abs(Number(value) - last.value) <= ADC_PUSH_DEADBAND) {
+			return;
+		}
+		if (now - last.time < ADC_PUSH_INTERVAL) {
+			return;
+		}
+	}
+	adc_pushed[sh_id] = {value: Number(value), time: now};
+	push("adc:" + zoneUid(sh_id) + ":" + value);
+}
+
+function touch(revs, id) {
+	// Запоминаем ревизию последнего изменения зоны, раздела или реле
+	revision++;
+	revs[id] = revision;
+}
+
 hub.signalUpdateSh.connect(updateSh); // Связать сигнал с функцией.
 function updateSh(sh, state) {
         let sh_id = Number(sh);
-        let shNum = hub.getShNum(sh_id);
-        let shPart = hub.getShPart(sh_id);
-        let shType = hub.getShType(sh_id);
-        let uid = "" + sh_id + "." + shNum + "." + shPart + "." + shType;
+        touch(zone_rev, sh_id);
 
-	udp.writeDatagram("zone:" + uid + ":" + state, host, port + 1);
-	udp.writeDatagram("zone:" + uid + ":" + state, host, port + 1);
+	push("zone:" + zoneUid(sh_id) + ":" + state);
 }
 
 hub.signalUpdatePart.connect(updatePart); // Связать сигнал с функцией.
 function updatePart(part, state) {
-	udp.writeDatagram("part:" + part + ":" + state, host, port + 1);
-	udp.writeDatagram("part:" + part + ":" + state, host, port + 1);
+	touch(part_rev, Number(part));
+	push("part:" + part + ":" + state);
 }
 
 hub.signalUpdateRelay.connect(updateRelay); // Связать сигнал с функцией.
 function updateRelay(rl, state) {
-	udp.writeDatagram("relay:" + rl + ":" + state, host, port + 1);
-	udp.writeDatagram("relay:" + rl + ":" + state, host, port + 1);
+	touch(relay_rev, Number(rl));
+	push("relay:" + rl + ":" + state);
 }
 
 hub.signalUpdateADC.connect(updateADC); // Связать сигнал с функцией.
 function updateADC(sh, adc) {
 	// Накапливаем значения ADC в словаре, чтобы отдавать их по запросу
         adc_list[sh] = adc;
+        touch(zone_rev, Number(sh));
+        pushAdc(Number(sh), adc);
 }
 
 hub.signalUpdateCounter.connect(updateCounter); // Связать сигнал с функцией.
 function updateCounter(sh, counter) {
 	// Накапливаем значения Counter в словаре ADC, чтобы отдавать их по запросу
         adc_list[sh] = counter;
+        touch(zone_rev, Number(sh));
+        pushAdc(Number(sh), counter);
 }
 
-function getZoneList() {
-    // Возвращает список зон с их конфигурацией, данными и описаниями
+function getSensorType(sh_id) {
+    // Возвращает тип сенсора зоны из sensor_types
+    if (sh_id in sensor_types) {
+       return sensor_types[sh_id];
+    }
+    return "unknownSensor";
+}
+
+
+function getZoneConf(sh_id) {
+    // Возвращает конфигурацию, данные и описание зоны
+    let shState = hub.getShState(sh_id);
+    let shType = hub.getShType(sh_id);
+    let shNum = hub.getShNum(sh_id);
+    let shPart = hub.getShPart(sh_id);
+    let shDev = hub.getShDev(sh_id);
+    let shDesc = hub.getShDescription(sh_id);
+    let sensorType = getSensorType(sh_id);
+
+    let shAdc = '-';
+    if (sh_id in adc_list) {
+       shAdc = adc_list[sh_id];
+    }
+
+    return "zone:" + sh_id + ":" + shNum + ":" + shPart + ":" + shType + ":" + shState + ":" + shAdc + ":" + sensorType + ":" + shDev + ":" + shDesc;
+}
+
+
+function getZoneList(offset, count) {
+    // Возвращает список зон с их конфигурацией, данными и описаниями.
+    // Если заданы offset и count, то возвращается только страница списка
+    // с заголовком "zones:смещение:всего_зон", чтобы ответ умещался в датаграмму
     let zoneConfig = "";
     const shList = hub.getShList();
     hub.writeLog("sh list:" + shList.toString());
-    for (var sh in shList) {
-       sh_id = Number(shList[sh]);
-       let shState = hub.getShState(sh_id);
-       let shAlarm = hub.isAlarmState(shState);
-       let shType = hub.getShType(sh_id);
-       let shNum = hub.getShNum(sh_id);
-       let shPart = hub.getShPart(sh_id);
-       let shDev = hub.getShDev(sh_id);
-       let shDesc = hub.getShDescription(sh_id);
-
-       let sensorType = "unknownSensor"
-       if (sh_id in sensor_types) {
-          sensorType = sensor_types[sh_id];
-       }
-
-       let shAdc = '-';
-       if (sh_id in adc_list) {
-          shAdc = adc_list[sh_id];
-       }
-
-       let shConf = "zone:" + sh_id + ":" + shNum + ":" + shPart + ":" + shType + ":" + shState + ":" + shAdc + ":" + sensorType + ":" + shDev + ":" + shDesc;
+    let first = 0;
+    let last = shList.length;
+    if (offset !== undefined) {
+       first = offset;
+       last = Math.min(offset + count, shList.length);
+       zoneConfig = "zones:" + offset + ":" + shList.length;
+    }
+    for (var sh = first; sh < last; sh++) {
+       let shConf = getZoneConf(Number(shList[sh]));
        if (zoneConfig != "") {
            zoneConfig += DLM;
        }
@@ -109,16 +199,117 @@ function getZoneList() {
 }
 
 
+function getZoneMeta(sh_id) {
+    // Возвращает конфигурацию и описание зоны без состояния и ADC
+    return "meta:" + sh_id + ":" + hub.getShNum(sh_id) + ":" + hub.getShPart(sh_id) + ":" + hub.getShType(sh_id) + ":" + getSensorType(sh_id) + ":" + hub.getShDev(sh_id) + ":" + hub.getShDescription(sh_id);
+}
+
+
+function hashString(hash, str) {
+    // FNV-1a (32 бита) по кодам символов строки
+    for (var i = 0; i < str.length; i++) {
+       hash ^= str.charCodeAt(i);
+       hash = (hash + (hash << 1) + (hash << 4) + (hash << 7) + (hash << 8) + (hash << 24)) >>> 0;
+    }
+    return hash;
+}
+
+
+function pushInt(bytes, value, size) {
+    // Добавляет в массив байтов целое число со знаком размером size байт
+    // (little endian)
+    if (value < 0) {
+       value += Math.pow(2, 8 * size);
+    }
+    for (var i = 0; i < size; i++) {
+       bytes.push(value % 256);
+       value = Math.floor(value / 256);
+    }
+}
+
+
+function base64(bytes) {
+    // Кодирует массив байтов в base64, датаграмма передается как текст
+    let out = "";
+    for (var i = 0; i < bytes.length; i += 3) {
+       let n = bytes[i] * 65536;
+       if (i + 1 < bytes.length) {
+          n += bytes[i + 1] * 256;
+       }
+       if (i + 2 < bytes.length) {
+          n += bytes[i + 2];
+       }
+       out += B64.charAt((n >> 18) & 63) + B64.charAt((n >> 12) & 63);
+       out += i + 1 < bytes.length ? B64.charAt((n >> 6) & 63) : "=";
+       out += i + 2 < bytes.length ? B64.charAt(n & 63) : "=";
+    }
+    return out;
+}
+
+
+function getZoneStates(offset, count) {
+    // Возвращает страницу зон в двоичном формате: заголовок
+    // "zonesbin:смещение:всего_зон:хеш_описаний" и блок base64. Блок: число
+    // записей u16, записи (номер зоны u16, код состояния i16 или -1), число
+    // значений ADC u16, значения (индекс записи u16, значение в сотых долях
+    // 48 бит со знаком)
+    const shList = hub.getShList();
+    const last = Math.min(offset + count, shList.length);
+    let bytes = [];
+    let adcs = [];
+    let hash = 2166136261;
+    pushInt(bytes, Math.max(last - offset, 0), 2);
+    for (var sh = offset; sh < last; sh++) {
+       let sh_id = Number(shList[sh]);
+       let state = parseInt(hub.getShState(sh_id), 10);
+       pushInt(bytes, sh_id, 2);
+       pushInt(bytes, isNaN(state) ? ZONE_STATE_UNKNOWN : state, 2);
+       if (sh_id in adc_list) {
+          let adc = Math.round(Number(adc_list[sh_id]) * 100);
+          if (isFinite(adc)) {
+             adcs.push([sh - offset, adc]);
+          }
+       }
+       hash = hashString(hash, getZoneMeta(sh_id) + DLM);
+    }
+    pushInt(bytes, adcs.length, 2);
+    for (var i = 0; i < adcs.length; i++) {
+       pushInt(bytes, adcs[i][0], 2);
+       pushInt(bytes, adcs[i][1], 6);
+    }
+
+    return ["zonesbin:" + offset + ":" + shList.length + ":" + hash, base64(bytes)].join(DLM);
+}
+
+
+function getZoneMetaList(offset, count) {
+    // Возвращает страницу описаний зон: заголовок
+    // "zonesmeta:смещение:всего_зон" и записи "meta:..."
+    const shList = hub.getShList();
+    const last = Math.min(offset + count, shList.length);
+    let metas = ["zonesmeta:" + offset + ":" + shList.length];
+    for (var sh = offset; sh < last; sh++) {
+       metas.push(getZoneMeta(Number(shList[sh])));
+    }
+    return metas.join(DLM);
+}
+
+
+function getPartConf(part_id) {
+    // Возвращает описание и состояние раздела
+    let partState = hub.getPartState(part_id);
+    let partDesc = hub.getPartDescription(part_id);
+    return "part:" + part_id + ":" + partState + ":" + partDesc;
+}
+
+
 function getPartList() {
     // Возвращает список разделов с их описаниями и состояниями
     let partConfig = "";
     const partList = hub.getPartList();
     hub.writeLog("part list: " + partList.toString());
     for (var part in partList) {
-       part_id = Number(partList[part]);
-       let partState = hub.getPartState(part_id);
-       let partDesc = hub.getPartDescription(part_id);
-       let partConf = "part:" + part_id + ":" + partState + ":" + partDesc;
+       let partConf = getPartConf(Number(partList[part]));
        if (partConfig != "") {
            partConfig += DLM;
        }
@@ -130,16 +321,21 @@ function getPartList() {
 }
 
 
+function getRelayConf(relay_id) {
+    // Возвращает описание и состояние реле
+    let relayState = hub.getRelayState(relay_id);
+    let relayDesc = hub.getRelayDescription(relay_id);
+    return "relay:" + relay_id + ":" + relayState + ":" + relayDesc;
+}
+
+
 function getRelayList() {
     // Возвращает список реле с описаниями и состояниями
     let relayConfig = ""
     const relayList = hub.getRlList();
     hub.writeLog("relay list:" + relayList.toString());
     for (var relay in relayList) {
-       relay_id = Number(relayList[relay]);
-       let relayState = hub.getRelayState(relay_id);
-       let relayDesc = hub.getRelayDescription(relay_id);
-       let relayConf = "relay:" + relay_id + ":" + relayState + ":" + relayDesc;
+       let relayConf = getRelayConf(Number(relayList[relay]));
        if (relayConfig != "") {
            relayConfig += DLM;
        }
@@ -151,12 +347,91 @@ function getRelayList() {
 }
 
 
+function getZoneState(sh_id) {
+    // Возвращает состояние и ADC зоны без конфигурации и описания
+    let shAdc = '-';
+    if (sh_id in adc_list) {
+       shAdc = adc_list[sh_id];
+    }
+    return "state:" + sh_id + ":" + hub.getShState(sh_id) + ":" + shAdc;
+}
+
+
+function getChanges(rEpoch, rRev, rStates) {
+    // Возвращает заголовок "changes:эпоха:ревизия" и записи зон, разделов и
+    // реле, изменившихся после ревизии rRev. Если скрипт был перезапущен
+    // (другая эпоха), то возвращается только заголовок с пометкой ":full" -
+    // интеграции нужно запросить все данные. Если изменений больше
+    // CHANGES_LIMIT, то возвращаются самые старые с заголовком
+    // "changes:эпоха:ревизия_последней_записи:more", и интеграция запрашивает
+    // следующие с этой ревизии. Если rStates, то зоны передаются записями
+    // "state:номер:код:adc", их описания интеграция уже получила из getZonesBin
+    let header = "changes:" + epoch + ":" + revision;
+    if (Number(rEpoch) != epoch || Number(rRev) > revision) {
+       return header + ":full";
+    }
+
+    let changed = [];
+    for (var sh in zone_rev) {
+       if (zone_rev[sh] > Number(rRev)) {
+          changed.push([zone_rev[sh], "zone", Number(sh)]);
+       }
+    }
+    for (var part in part_rev) {
+       if (part_rev[part] > Number(rRev)) {
+          changed.push([part_rev[part], "part", Number(part)]);
+       }
+    }
+    for (var relay in relay_rev) {
+       if (relay_rev[relay] > Number(rRev)) {
+          changed.push([relay_rev[relay], "relay", Number(relay)]);
+       }
+    }
+
+    if (changed.length > CHANGES_LIMIT) {
+       changed.sort(function (a, b) { return a[0] - b[0]; });
+       changed = changed.slice(0, CHANGES_LIMIT);
+       header = "changes:" + epoch + ":" + changed[CHANGES_LIMIT - 1][0] + ":more";
+    }
+
+    let changes = [header];
+    for (var i = 0; i < changed.length; i++) {
+       if (changed[i][1] == "zone") {
+          changes.push(rStates ? getZoneState(changed[i][2]) : getZoneConf(changed[i][2]));
+       } else if (changed[i][1] == "part") {
+          changes.push(getPartConf(changed[i][2]));
+       } else {
+          changes.push(getRelayConf(changed[i][2]));
+       }
+    }
+    return changes.join(DLM);
+}
+
+
 
 // Прием данных по протоколу UDP и отправка ответов
 udp.readDatagram.connect(readDatagram);
 udp.bind(port);
 function readDatagram(rData, rHost, rPort)
 {
+    // Необязательный идентификатор запроса: "#id#команда". Ответ отправляется
+    // с тем же префиксом "#id#", чтобы интеграция могла сопоставить его с
+    // запросом и держать несколько команд одновременно в одном сокете
+    var rid = "";
+    if (rData.charAt(0) == "#") {
+       var ridEnd = rData.indexOf("#", 1);
+       if (ridEnd > 0) {
+          rid = rData.substring(0, ridEnd + 1);
+          rData = rData.substring(ridEnd + 1);
+       }
+    }
+
+    function reply(data) {
+       udp.writeDatagram(rid + data, rHost, rPort);
+    }
+
+    // Команды arm, disarm, relay_on, relay_off принимают как один номер,
+    // так и список номеров через запятую, например "relay_on:1,2,5,7"
     var request = rData.split(":");
     parnum = request.length;
 
@@ -165,62 +440,110 @@ function readDatagram(rData, rHost, rPort)
           // Используется для первоначальной проверки наличия 
           // сервиса при добавлении интеграции в home assistant
           hub.writeLog("PING from " + rHost);
-          udp.writeDatagram("PONG", rHost, rPort);
+          reply("PONG");
           return;
        }
 
        if (request[0] == "getZones" && parnum == 1) {
           // Ответ на запрос данных всех подключенных зон
-          udp.writeDatagram(getZoneList(), rHost, rPort);
+          reply(getZoneList());
+          return;
+       }
+
+       if (request[0] == "getZones" && parnum == 3) {
+          // Ответ на запрос страницы зон: "getZones:смещение:количество"
+          reply(getZoneList(Number(request[1]), Number(request[2])));
+          return;
+       }
+
+       if (request[0] == "getZonesBin" && parnum == 3) {
+          // Страница зон в двоичном формате: "getZonesBin:смещение:количество"
+          reply(getZoneStates(Number(request[1]), Number(request[2])));
+          return;
+       }
+
+       if (request[0] == "getZonesMeta" && parnum == 3) {
+          // Страница описаний зон: "getZonesMeta:смещение:количество"
+          reply(getZoneMetaList(Number(request[1]), Number(request[2])));
+          return;
+       }
+
+       if (request[0] == "getRev" && parnum == 1) {
+          // Текущая ревизия, запрашивается перед полным запросом данных
+          reply("rev:" + epoch + ":" + revision);
+          return;
+       }
+
+       if (request[0] == "getChanges" && parnum == 3) {
+          // Изменения после ревизии: "getChanges:эпоха:ревизия"
+          reply(getChanges(request[1], request[2], false));
+          return;
+       }
+
+       if (request[0] == "getChanges" && parnum == 4 && request[3] == "states") {
+          // Изменения без описаний зон: "getChanges:эпоха:ревизия:states"
+          reply(getChanges(request[1], request[2], true));
           return;
        }
 
        if (request[0] == "getParts" && parnum == 1) {
           // Ответ на запрос данных всех подключенных разделов
-          udp.writeDatagram(getPartList(), rHost, rPort);
+          reply(getPartList());
           return;
        }
 
        if (request[0] == "getRelays" && parnum == 1) {
           // Ответ на запрос данных всех подключенных реле
-          udp.writeDatagram(getRelayList(), rHost, rPort);
+          reply(getRelayList());
           return;
        }
 
        if (request[0] == "arm" && parnum == 2) {
           hub.writeLog("ARM partition: " + rHost + ":" + rPort + ": " + request[1]);
-          hub.controlPartArm(Number(request[1]));
-          udp.writeDatagram("ARM_OK", rHost, rPort);
+          var ids = request[1].split(",");
+          for (var i = 0; i < ids.length; i++) {
+             hub.controlPartArm(Number(ids[i]));
+          }
+          reply("ARM_OK");
           return;
        }
 
        if (request[0] == "disarm" && parnum == 2) {
           hub.writeLog("DISARM partition: " + rHost + ":" + rPort + ": " + request[1]);
-          hub.controlPartDisArm(Number(request[1]));
-          udp.writeDatagram("DISARM_OK", rHost, rPort);
+          var ids = request[1].split(",");
+          for (var i = 0; i < ids.length; i++) {
+             hub.controlPartDisArm(Number(ids[i]));
+          }
+          reply("DISARM_OK");
           return;
        }
 
        if (request[0] == "relay_on" && parnum == 2) {
           hub.writeLog("Switch ON relay: " + rHost + ":" + rPort + ": " + request[1]);
-          hub.controlRelayOn(Number(request[1]));
-          udp.writeDatagram("RELAY_OK", rHost, rPort);
+          var ids = request[1].split(",");
+          for (var i = 0; i < ids.length; i++) {
+             hub.controlRelayOn(Number(ids[i]));
+          }
+          reply("RELAY_OK");
           return;
        }
 
        if (request[0] == "relay_off" && parnum == 2) {
           hub.writeLog("Switch OFF relay: " + rHost + ":" + rPort + ": " + request[1]);
-          hub.controlRelayOff(Number(request[1]));
-          udp.writeDatagram("RELAY_OK", rHost, rPort);
+          var ids = request[1].split(",");
+          for (var i = 0; i < ids.length; i++) {
+             hub.controlRelayOff(Number(ids[i]));
+          }
+          reply("RELAY_OK");
           return;
        }
 
        // Если добрались сюда, то команда в запросе была неверной
        hub.writeLog("UDP readDatagram (" + rHost + ":" + rPort + "): " + rData + ", " + parnum);
-       udp.writeDatagram("BAD_CMD", rHost, rPort);
+       reply("BAD_CMD");
     } else {
        // Формат команды неверный!
        hub.writeLog("UDP readDatagram (" + rHost + ":" + rPort + "): " + rData + ", " + parnum);
-       udp.writeDatagram("BAD_CMD", rHost, rPort);
+       reply("BAD_CMD");
     }
 }
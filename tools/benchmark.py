@@ -0,0 +1,62 @@
+"""Benchmarks of the parse, update and dispatch hot paths.
+
+Results are printed (or written with --output) as JSON to compare releases:
+
+    python tools/benchmark.py --output bench.json
+
+The measurements are in benchmarks/measure.py, they are also run by pytest
+(python -m pytest benchmarks). Protocol benchmarks need only aioudp, the
+push to entity benchmark runs if homeassistant is installed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+from pathlib import Path
+import sys
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+import measure  # noqa: E402  pylint: disable=wrong-import-position
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Run all benchmarks."""
+    hub_module, package = measure.load_integration()
+    results = measure.environment()
+    results["parse"] = measure.bench_parse(hub_module)
+    results["wire"] = measure.bench_wire(hub_module)
+    results["update_device"] = measure.bench_update_device(hub_module)
+    if not args.no_network:
+        results["get_devices"] = await measure.bench_get_devices(hub_module)
+    if package is None:
+        results["push_to_entity"] = {"skipped": "homeassistant is not installed"}
+    else:
+        results["push_to_entity"] = await measure.bench_push_to_entity(
+            hub_module, package
+        )
+    return results
+
+
+def main() -> None:
+    """Parse command line, run benchmarks and emit JSON."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", help="write JSON to file instead of stdout")
+    parser.add_argument(
+        "--no-network", action="store_true", help="skip get_devices over UDP"
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    data = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(data + "\n")
+    else:
+        print(data)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,531 @@
+"""Offline HUB-C2000PP simulator and push load generator.
+
+The simulator speaks the same UDP protocol as script.js, so the integration
+(or its parts) can run without a C2000-PP and the HUB-C2000PP service:
+
+    python tools/hubsim.py serve --zones 500 --push-rate 50
+    python tools/hubsim.py load --target 127.0.0.1:22001 --rate 5000
+
+Only the standard library is used.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+from dataclasses import dataclass
+import logging
+import random
+import struct
+import time
+import zlib
+
+_LOGGER = logging.getLogger(__name__)
+
+DLM = "__DLM__"
+CHANGES_LIMIT = 10
+# push generator timer resolution (s), pushes due within a tick are sent at once
+PUSH_TICK = 0.01
+
+# Sensor types assigned to zones in turn, same names as in script.js
+SENSOR_TYPES = (
+    "doorSensor",
+    "motionSensor",
+    "temperatureSensor",
+    "humiditySensor",
+    "smokeSensor",
+    "statusSensor",
+    "ripOutputSensor",
+    "ripCurrentSensor",
+    "ripBatteryVoltageSensor",
+    "ripBatteryLevelSensor",
+    "ripInputVoltageSensor",
+    "soundSensor",
+    "carbonMonoxideSensor",
+    "counterSensor",
+    "genericAdcSensor",
+)
+ADC_TYPES = frozenset(SENSOR_TYPES[2:4] + SENSOR_TYPES[6:])
+# Zone codes used for random state changes: armed, disarmed, alarms, faults
+ZONE_CODES = (24, 109, 117, 119, 3, 37, 45, 250, 251)
+PART_ARMED = 24
+PART_DISARMED = 109
+# Zone descriptions of a real installation are long and Cyrillic (2 bytes per
+# letter in UTF-8), a description may contain ":"
+ZONE_PLACES = (
+    "Коридор первого этажа у лестницы",
+    "Серверная: стойка 2, фальшпол",
+    "Склад готовой продукции, ворота",
+    "Кабинет бухгалтерии, окно",
+    "Тамбур главного входа",
+)
+
+
+@dataclass(slots=True)
+class SimZone:
+    """Simulated zone."""
+
+    id: int
+    sh: int
+    part: int
+    stype: int
+    state: int
+    adc: float | None
+    type: str
+    dev: int
+    desc: str
+
+    @property
+    def uid(self) -> str:
+        """Zone uid as sent in pushes."""
+        return f"{self.id}.{self.sh}.{self.part}.{self.stype}"
+
+    def conf(self) -> str:
+        """Zone record of getZones reply."""
+        adc = "-" if self.adc is None else f"{self.adc:g}"
+        return (
+            f"zone:{self.id}:{self.sh}:{self.part}:{self.stype}:{self.state}:{adc}"
+            f":{self.type}:{self.dev}:{self.desc}"
+        )
+
+    def state_record(self) -> str:
+        """Zone state record of getChanges reply with states flag."""
+        adc = "-" if self.adc is None else f"{self.adc:g}"
+        return f"state:{self.id}:{self.state}:{adc}"
+
+    def meta(self) -> str:
+        """Zone metadata record of getZonesMeta reply."""
+        return (
+            f"meta:{self.id}:{self.sh}:{self.part}:{self.stype}:{self.type}"
+            f":{self.dev}:{self.desc}"
+        )
+
+
+class SimHub:
+    """Hub data and command handling of script.js, without any I/O."""
+
+    def __init__(
+        self, zones: int = 100, parts: int = 4, relays: int = 8, seed: int = 0
+    ) -> None:
+        """Create zones, partitions and relays."""
+        self.random = random.Random(seed)
+        self.zones = {
+            zone_id: SimZone(
+                id=zone_id,
+                sh=1 + zone_id % 8,
+                part=1 + zone_id % parts,
+                stype=4,
+                state=PART_ARMED,
+                adc=None,
+                type=SENSOR_TYPES[zone_id % len(SENSOR_TYPES)],
+                dev=1 + zone_id // 8,
+                desc=f"Зона {zone_id}. {ZONE_PLACES[zone_id % len(ZONE_PLACES)]}",
+            )
+            for zone_id in range(1, zones + 1)
+        }
+        self.zone_ids = list(self.zones)
+        self.parts = {part_id: PART_DISARMED for part_id in range(1, parts + 1)}
+        self.relays = {relay_id: False for relay_id in range(1, relays + 1)}
+        self.epoch = int(time.time() * 1000)
+        self.revision = 0
+        self.zone_rev: dict[int, int] = {}
+        self.part_rev: dict[int, int] = {}
+        self.relay_rev: dict[int, int] = {}
+        self.push_seq = 0
+        self.commands = 0
+        # pushes produced by commands and changes, taken by the server
+        self.outbox: list[str] = []
+
+    def _touch(self, revs: dict[int, int], item_id: int) -> None:
+        """Remember revision of the last change."""
+        self.revision += 1
+        revs[item_id] = self.revision
+
+    def _push(self, data: str) -> None:
+        """Queue numbered push."""
+        self.push_seq += 1
+        self.outbox.append(f"{data}:{self.push_seq}")
+
+    def set_zone(self, zone_id: int, state: int) -> None:
+        """Change zone state and push it."""
+        zone = self.zones[zone_id]
+        zone.state = state
+        self._touch(self.zone_rev, zone_id)
+        self._push(f"zone:{zone.uid}:{state}")
+
+    def set_adc(self, zone_id: int, value: float, push: bool = False) -> None:
+        """Change zone ADC value, push it if ADC pushes are enabled."""
+        zone = self.zones[zone_id]
+        zone.adc = value
+        self._touch(self.zone_rev, zone_id)
+        if push:
+            self._push(f"adc:{zone.uid}:{value:g}")
+
+    def set_part(self, part_id: int, state: int) -> None:
+        """Change partition state and push it."""
+        self.parts[part_id] = state
+        self._touch(self.part_rev, part_id)
+        self._push(f"part:{part_id}:{state}")
+
+    def set_relay(self, relay_id: int, state: bool) -> None:
+        """Change relay state and push it."""
+        self.relays[relay_id] = state
+        self._touch(self.relay_rev, relay_id)
+        self._push(f"relay:{relay_id}:{'true' if state else 'false'}")
+
+    def random_change(self, adc_push: bool = False) -> None:
+        """Change state or ADC value of a random zone."""
+        zone_id = self.random.choice(self.zone_ids)
+        if self.zones[zone_id].type in ADC_TYPES and self.random.random() < 0.5:
+            self.set_adc(zone_id, round(self.random.uniform(0, 30), 2), adc_push)
+        else:
+            self.set_zone(zone_id, self.random.choice(ZONE_CODES))
+
+    def _part_conf(self, part_id: int) -> str:
+        """Partition record."""
+        return f"part:{part_id}:{self.parts[part_id]}:Раздел {part_id}"
+
+    def _relay_conf(self, relay_id: int) -> str:
+        """Relay record."""
+        state = "true" if self.relays[relay_id] else "false"
+        return f"relay:{relay_id}:{state}:Реле {relay_id}"
+
+    def get_zones(self, offset: int | None = None, count: int = 0) -> str:
+        """Reply to getZones, paged with header if offset is set."""
+        if offset is None:
+            return DLM.join(zone.conf() for zone in self.zones.values())
+        page = self.zone_ids[offset : offset + count]
+        header = f"zones:{offset}:{len(self.zone_ids)}"
+        return DLM.join([header, *(self.zones[zone_id].conf() for zone_id in page)])
+
+    def get_zones_bin(self, offset: int, count: int) -> str:
+        """Reply to getZonesBin, states with the metadata hash of the page."""
+        page = [
+            self.zones[zone_id] for zone_id in self.zone_ids[offset : offset + count]
+        ]
+        adcs = [
+            (index, round(zone.adc * 100))
+            for index, zone in enumerate(page)
+            if zone.adc is not None
+        ]
+        data = struct.pack("<H", len(page))
+        data += b"".join(struct.pack("<Hh", zone.id, zone.state) for zone in page)
+        data += struct.pack("<H", len(adcs))
+        data += b"".join(
+            struct.pack("<HHi", index, adc & 0xFFFF, adc >> 16) for index, adc in adcs
+        )
+        # any hash works, the integration only compares it with the saved one
+        page_hash = zlib.crc32(DLM.join(zone.meta() for zone in page).encode())
+        return DLM.join(
+            [
+                f"zonesbin:{offset}:{len(self.zone_ids)}:{page_hash}",
+                base64.b64encode(data).decode(),
+            ]
+        )
+
+    def get_zones_meta(self, offset: int, count: int) -> str:
+        """Reply to getZonesMeta, metadata records of a page."""
+        page = self.zone_ids[offset : offset + count]
+        header = f"zonesmeta:{offset}:{len(self.zone_ids)}"
+        return DLM.join([header, *(self.zones[zone_id].meta() for zone_id in page)])
+
+    def get_changes(self, epoch: str, rev: str, states: bool = False) -> str:
+        """Reply to getChanges, zones as state records if states is set.
+
+        At most CHANGES_LIMIT oldest changes are returned, the header of a
+        partial reply ends with ":more" and has the revision of its last one.
+        """
+        header = f"changes:{self.epoch}:{self.revision}"
+        if int(epoch) != self.epoch or int(rev) > self.revision:
+            return f"{header}:full"
+
+        since = int(rev)
+        changed = sorted(
+            (item_rev, kind, item_id)
+            for kind, revs in (
+                ("zone", self.zone_rev),
+                ("part", self.part_rev),
+                ("relay", self.relay_rev),
+            )
+            for item_id, item_rev in revs.items()
+            if item_rev > since
+        )
+        if len(changed) > CHANGES_LIMIT:
+            changed = changed[:CHANGES_LIMIT]
+            header = f"changes:{self.epoch}:{changed[-1][0]}:more"
+
+        changes = []
+        for _, kind, item_id in changed:
+            if kind == "zone":
+                zone = self.zones[item_id]
+                changes.append(zone.state_record() if states else zone.conf())
+            elif kind == "part":
+                changes.append(self._part_conf(item_id))
+            else:
+                changes.append(self._relay_conf(item_id))
+        return DLM.join([header, *changes])
+
+    def handle(self, request: str) -> str:
+        """Handle command, return reply with the request id prefix if any."""
+        self.commands += 1
+        rid = ""
+        if request.startswith("#"):
+            rid_end = request.find("#", 1)
+            if rid_end > 0:
+                rid = request[: rid_end + 1]
+                request = request[rid_end + 1 :]
+        return rid + self._reply(request.split(":"))
+
+    def _reply(self, request: list[str]) -> str:
+        """Reply to parsed command."""
+        command, args = request[0], request[1:]
+        try:
+            if command == "PING" and not args:
+                return "PONG"
+            if command == "getZones" and not args:
+                return self.get_zones()
+            if command == "getZones" and len(args) == 2:
+                return self.get_zones(int(args[0]), int(args[1]))
+            if command == "getZonesBin" and len(args) == 2:
+                return self.get_zones_bin(int(args[0]), int(args[1]))
+            if command == "getZonesMeta" and len(args) == 2:
+                return self.get_zones_meta(int(args[0]), int(args[1]))
+            if command == "getRev" and not args:
+                return f"rev:{self.epoch}:{self.revision}"
+            if command == "getChanges" and len(args) == 2:
+                return self.get_changes(args[0], args[1])
+            if command == "getChanges" and args[2:] == ["states"]:
+                return self.get_changes(args[0], args[1], states=True)
+            if command == "getParts" and not args:
+                return DLM.join(self._part_conf(part_id) for part_id in self.parts)
+            if command == "getRelays" and not args:
+                return DLM.join(self._relay_conf(relay_id) for relay_id in self.relays)
+            if command in ("arm", "disarm") and len(args) == 1:
+                state = PART_ARMED if command == "arm" else PART_DISARMED
+                for part_id in args[0].split(","):
+                    if int(part_id) in self.parts:
+                        self.set_part(int(part_id), state)
+                return "ARM_OK" if command == "arm" else "DISARM_OK"
+            if command in ("relay_on", "relay_off") and len(args) == 1:
+                for relay_id in args[0].split(","):
+                    if int(relay_id) in self.relays:
+                        self.set_relay(int(relay_id), command == "relay_on")
+                return "RELAY_OK"
+        except ValueError:
+            pass
+        return "BAD_CMD"
+
+
+class HubSimProtocol(asyncio.DatagramProtocol):
+    """Serve SimHub commands over UDP and send its pushes to port + 1."""
+
+    def __init__(
+        self,
+        hub: SimHub,
+        push_host: str,
+        push_port: int,
+        latency: float = 0,
+        loss: float = 0,
+    ) -> None:
+        """Init protocol data, loss is the probability to drop a datagram."""
+        self.hub = hub
+        self.push_addr = (push_host, push_port)
+        self.latency = latency
+        self.loss = loss
+        self.transport: asyncio.DatagramTransport | None = None
+        self.sent = 0
+        self.dropped = 0
+
+    def connection_made(self, transport: asyncio.BaseTransport) -> None:
+        """Store transport."""
+        self.transport = transport  # type: ignore[assignment]
+
+    def _send(self, data: str, addr: tuple[str, int]) -> None:
+        """Send datagram unless lost."""
+        if self.transport is None or self.transport.is_closing():
+            return
+        if self.loss and self.hub.random.random() < self.loss:
+            self.dropped += 1
+            return
+        self.transport.sendto(data.encode("utf-8"), addr)
+        self.sent += 1
+
+    def _send_later(self, data: str, addr: tuple[str, int]) -> None:
+        """Send datagram after simulated latency."""
+        if self.latency:
+            asyncio.get_running_loop().call_later(self.latency, self._send, data, addr)
+        else:
+            self._send(data, addr)
+
+    def flush_pushes(self) -> None:
+        """Send queued pushes, each twice like script.js."""
+        outbox, self.hub.outbox = self.hub.outbox, []
+        for data in outbox:
+            self._send_later(data, self.push_addr)
+            self._send_later(data, self.push_addr)
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        """Handle command."""
+        if self.loss and self.hub.random.random() < self.loss:
+            self.dropped += 1
+            return
+        self._send_later(self.hub.handle(data.decode("utf-8")), addr)
+        self.flush_pushes()
+
+
+async def start_simulator(
+    hub: SimHub,
+    host: str = "127.0.0.1",
+    port: int = 22000,
+    push_host: str = "127.0.0.1",
+    latency: float = 0,
+    loss: float = 0,
+) -> tuple[asyncio.DatagramTransport, HubSimProtocol]:
+    """Start serving hub on host:port, pushes go to push_host:port + 1."""
+    loop = asyncio.get_running_loop()
+    return await loop.create_datagram_endpoint(
+        lambda: HubSimProtocol(hub, push_host, port + 1, latency, loss),
+        local_addr=(host, port),
+    )
+
+
+async def generate_changes(
+    protocol: HubSimProtocol,
+    rate: float,
+    duration: float | None = None,
+    adc_push: bool = False,
+) -> int:
+    """Make random zone changes at rate per second, return count of changes."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    done = 0
+    while duration is None or loop.time() - start < duration:
+        await asyncio.sleep(PUSH_TICK)
+        due = int((loop.time() - start) * rate) - done
+        for _ in range(due):
+            protocol.hub.random_change(adc_push)
+        done += due
+        protocol.flush_pushes()
+    return done
+
+
+async def run_load(
+    host: str,
+    port: int,
+    rate: float,
+    duration: float,
+    hub: SimHub | None = None,
+    duplicate: bool = True,
+) -> dict[str, float]:
+    """Send pushes of random zone changes straight to a listener.
+
+    Pushes are numbered like script.js and sent twice if duplicate is set,
+    returns send statistics.
+    """
+    hub = hub or SimHub()
+    loop = asyncio.get_running_loop()
+    transport, _ = await loop.create_datagram_endpoint(
+        asyncio.DatagramProtocol, remote_addr=(host, port)
+    )
+    copies = 2 if duplicate else 1
+    pushes = 0
+    sent = 0
+    start = loop.time()
+    try:
+        while (elapsed := loop.time() - start) < duration:
+            for _ in range(int(elapsed * rate) - pushes):
+                zone_id = hub.random.choice(hub.zone_ids)
+                hub.set_zone(zone_id, hub.random.choice(ZONE_CODES))
+            outbox, hub.outbox = hub.outbox, []
+            pushes += len(outbox)
+            for data in outbox:
+                payload = data.encode("utf-8")
+                for _ in range(copies):
+                    transport.sendto(payload)
+                sent += copies
+            await asyncio.sleep(PUSH_TICK)
+    finally:
+        transport.close()
+
+    elapsed = loop.time() - start
+    return {
+        "pushes": pushes,
+        "datagrams": sent,
+        "seconds": elapsed,
+        "rate": pushes / elapsed,
+    }
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    """Run simulator until interrupted."""
+    hub = SimHub(args.zones, args.parts, args.relays, args.seed)
+    transport, protocol = await start_simulator(
+        hub, args.host, args.port, args.push_host, args.latency, args.loss
+    )
+    _LOGGER.info(
+        "Simulating %d zones on %s:%d, pushes to %s:%d",
+        args.zones,
+        args.host,
+        args.port,
+        args.push_host,
+        args.port + 1,
+    )
+    try:
+        if args.push_rate:
+            await generate_changes(protocol, args.push_rate, adc_push=args.adc_push)
+        else:
+            await asyncio.Event().wait()
+    finally:
+        transport.close()
+
+
+async def _load(args: argparse.Namespace) -> None:
+    """Run load generator and print statistics."""
+    host, _, port = args.target.rpartition(":")
+    hub = SimHub(args.zones, seed=args.seed)
+    stats = await run_load(
+        host, int(port), args.rate, args.duration, hub, not args.no_duplicate
+    )
+    print(
+        f"{stats['pushes']:.0f} pushes ({stats['datagrams']:.0f} datagrams) "
+        f"in {stats['seconds']:.1f} s, {stats['rate']:.0f} pushes/s"
+    )
+
+
+def main() -> None:
+    """Parse command line and run simulator or load generator."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="simulate hub with script.js")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=22000)
+    serve.add_argument("--push-host", default="127.0.0.1", help="HA address")
+    serve.add_argument("--zones", type=int, default=100)
+    serve.add_argument("--parts", type=int, default=4)
+    serve.add_argument("--relays", type=int, default=8)
+    serve.add_argument("--latency", type=float, default=0, help="reply delay, s")
+    serve.add_argument("--loss", type=float, default=0, help="datagram loss, 0..1")
+    serve.add_argument("--push-rate", type=float, default=0, help="changes/s")
+    serve.add_argument("--adc-push", action="store_true", help="push ADC changes")
+    serve.add_argument("--seed", type=int, default=0)
+
+    load = commands.add_parser("load", help="send pushes to a listener")
+    load.add_argument("--target", default="127.0.0.1:22001", help="host:port")
+    load.add_argument("--rate", type=float, default=1000, help="pushes/s")
+    load.add_argument("--duration", type=float, default=10, help="seconds")
+    load.add_argument("--zones", type=int, default=100)
+    load.add_argument("--no-duplicate", action="store_true")
+    load.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(args) if args.command == "serve" else _load(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()